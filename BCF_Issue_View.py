@@ -12,499 +12,2195 @@ bl_info = {
 }
 
 import bpy
+import bpy.utils.previews
 import mathutils
 import bmesh
+import numpy as np
 import xml.etree.ElementTree as ET
 import os
 import math
+import posixpath
+import zipfile
+import tempfile
+import time
+import traceback
+import sys
+import json
+import argparse
+import hashlib
+import struct
+import zlib
+import subprocess
+import shutil
+import tracemalloc
+import importlib
+import sqlite3
+import uuid
+from contextlib import contextmanager, closing
+from collections import namedtuple, Counter
+from concurrent.futures import ThreadPoolExecutor
 from mathutils import Matrix, Vector
+from mathutils.bvhtree import BVHTree
+from bpy.app.handlers import persistent
 from datetime import datetime
 
 distance_between_layers = 0.01
-number_cuts = 50
+resample_tile_rows = 256
+resample_threads = None
+projection_cache_eviction = True
+planar_frame_property = "bcf_planar_uv_frame"
+cache_key_property = "bcf_cache_key"
+visibility_grid_size = 32
+normal_tolerance = 0.001
+plane_distance_tolerance = 0.001
+issue_layer_property = "bcf_issue_layer"
+issue_state_property = "bcf_issue_state"
+issue_topic_property = "bcf_issue_topic"
+clipping_planes_property = "bcf_clipping_planes"
+ifc_guid_properties = ("GlobalId", "IfcGuid", "ifc_guid")
+topic_load_batch_size = 250
+job_slice_seconds = 0.05
+job_prefetch_count = 4
+raster_tile_rows = 64
+raster_small_triangle_size = 8
+raster_batch_triangles = 1 << 14
+patch_min_coverage = 0.002
+ray_box_chunk_elements = 1 << 20
+weld_distance = 1e-5
+collinear_tolerance = 1e-6
+
+# records read from a BCF archive
+
+BCFTopic = namedtuple("BCFTopic", ["guid", "title", "status", "topic_type", "assigned_to", "labels", "creation_date", "folder", "viewpoints"])
+BCFViewpointEntry = namedtuple("BCFViewpointEntry", ["guid", "viewpoint", "snapshot"])
+BCFViewpoint = namedtuple("BCFViewpoint", ["camera_location", "camera_direction", "camera_up_vector", "field_of_view", "components", "view_to_world_scale", "clipping_planes"])
+BCFComponents = namedtuple("BCFComponents", ["selection", "default_visibility", "visibility_exceptions", "coloring"])
+
+# remove the xml namespace of a tag
+
+def get_local_tag(tag):
+    return tag.rsplit('}', 1)[-1]
+
+# read the topic of a markup.bcf file, elements are cleared after reading to keep the memory constant
+
+def read_bcf_markup(stream, folder):
+    
+    guid = title = status = topic_type = assigned_to = creation_date = None
+    labels = []
+    viewpoints = []
+    in_topic = False
+    viewpoint_tag = None
+    viewpoint_guid = viewpoint_file = snapshot_file = None
+    
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = get_local_tag(elem.tag)
+        
+        if event == "start":
+            if tag == "Topic":
+                in_topic = True
+                guid = elem.get("Guid")
+                status = elem.get("TopicStatus")
+                topic_type = elem.get("TopicType")
+            elif tag == "ViewPoint" or (tag == "Viewpoints" and elem.get("Guid")):
+                # BCF 3.0 nests ViewPoint elements, BCF 2.1 uses one Viewpoints element per viewpoint
+                viewpoint_tag = tag
+                viewpoint_guid = elem.get("Guid")
+                viewpoint_file = snapshot_file = None
+            continue
+        
+        text = (elem.text or "").strip()
+        
+        if viewpoint_tag:
+            if tag == "Viewpoint":
+                viewpoint_file = text
+            elif tag == "Snapshot":
+                snapshot_file = text
+            elif tag == viewpoint_tag:
+                viewpoint_tag = None
+                viewpoints.append(BCFViewpointEntry(
+                    viewpoint_guid,
+                    posixpath.join(folder, viewpoint_file) if viewpoint_file else None,
+                    posixpath.join(folder, snapshot_file) if snapshot_file else None
+                ))
+        elif in_topic:
+            if tag == "Title":
+                title = text
+            elif tag == "AssignedTo":
+                assigned_to = text
+            elif tag == "CreationDate":
+                creation_date = text
+            elif tag in ("Labels", "Label") and text:
+                labels.append(text)
+            elif tag == "Topic":
+                in_topic = False
+        
+        elem.clear()
+    
+    return BCFTopic(guid or posixpath.basename(folder), title, status, topic_type, assigned_to, labels, creation_date, folder, viewpoints)
 
-# create camera with bcf data via file path
+# walk through all topics of a .bcfzip archive without extracting it, extracted archives are read from their folder
 
-def main_create_camera_with_BCF_data(context):
+def iter_bcf_topics(archive_path):
     
-    # find absolute path
-    absolute_path = bpy.path.abspath(bpy.context.scene.import_filepath)
-    # path to XML_File
-    absolute_snapshot_path = absolute_path
+    if os.path.isdir(archive_path):
+        yield from iter_bcf_folder_topics(archive_path)
+        return
+    
+    with zipfile.ZipFile(archive_path) as archive:
+        names = archive.namelist()
+        members = set(names)
+        
+        for name in names:
+            if posixpath.basename(name) != "markup.bcf":
+                continue
+            
+            folder = posixpath.dirname(name)
+            with archive.open(name) as stream:
+                topic = read_bcf_markup(stream, folder)
+            
+            # older archives do not list the viewpoints in the markup
+            if not topic.viewpoints:
+                viewpoint_file = posixpath.join(folder, "viewpoint.bcfv")
+                snapshot_file = posixpath.join(folder, "snapshot.png")
+                if viewpoint_file in members:
+                    topic.viewpoints.append(BCFViewpointEntry(None, viewpoint_file, snapshot_file if snapshot_file in members else None))
+            
+            yield topic
 
-    base_path = os.path.dirname(absolute_snapshot_path)
+def iter_bcf_folder_topics(folder_path):
+    
+    for entry in sorted(os.scandir(folder_path), key=lambda entry: entry.name):
+        markup_path = os.path.join(entry.path, "markup.bcf")
+        if not entry.is_dir() or not os.path.isfile(markup_path):
+            continue
+        
+        with open(markup_path, 'rb') as stream:
+            topic = read_bcf_markup(stream, entry.name)
+        
+        # older archives do not list the viewpoints in the markup
+        if not topic.viewpoints and os.path.isfile(os.path.join(entry.path, "viewpoint.bcfv")):
+            snapshot_file = posixpath.join(entry.name, "snapshot.png")
+            topic.viewpoints.append(BCFViewpointEntry(None, posixpath.join(entry.name, "viewpoint.bcfv"), snapshot_file if os.path.isfile(os.path.join(entry.path, "snapshot.png")) else None))
+        
+        yield topic
 
-    # get relative path to viewpoint and snapshot 
-    viewpoint_path = "viewpoint.bcfv"
-            
-    # create absolute path to the files
-    absolute_viewpoint_path = os.path.join(base_path, viewpoint_path)
+# get the snapshot and viewpoint path of the first viewpoint of a topic
 
-    # define new tree and root
-    tree = ET.parse(absolute_viewpoint_path)
-    root = tree.getroot()
+def get_bcf_viewpoint_paths(archive_path, topic):
+    
+    if not topic.viewpoints or not topic.viewpoints[0].snapshot:
+        raise LookupError(f"The topic '{topic.guid}' has no viewpoint with a snapshot.")
+    
+    viewpoint = topic.viewpoints[0]
+    snapshot_path = os.path.join(archive_path, *viewpoint.snapshot.split("/"))
+    viewpoint_path = os.path.join(archive_path, *viewpoint.viewpoint.split("/"))
+    return snapshot_path, viewpoint_path
 
-    # extract data
-    location = root.find('.//PerspectiveCamera/CameraViewPoint')
-    direction = root.find('.//PerspectiveCamera/CameraDirection')
-    up_vector = root.find('.//PerspectiveCamera/CameraUpVector')
-    field_of_view_bcf = root.find('.//PerspectiveCamera')
+# read the camera of a .bcfv file
 
-    camera_location = (
-        float(location.find('X').text),
-        float(location.find('Y').text),
-        float(location.find('Z').text)
+def read_bcf_viewpoint(stream):
+    
+    vectors = {}
+    field_of_view = None
+    view_to_world_scale = None
+    path = []
+    
+    # clipping planes as location and direction, the direction points to the clipped side
+    clipping_planes = []
+    plane = {}
+    
+    # IFC GUIDs of the components, the default visibility is None if the viewpoint has no visibility
+    selection = []
+    default_visibility = None
+    visibility_exceptions = []
+    coloring = []
+    
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = get_local_tag(elem.tag)
+        
+        if event == "start":
+            path.append(tag)
+            if tag == "Visibility":
+                default_visibility = elem.get("DefaultVisibility", "false").lower() == "true"
+            elif tag == "Color" and "Coloring" in path:
+                coloring.append((elem.get("Color"), []))
+            continue
+        
+        path.pop()
+        if len(path) >= 2 and path[-2] in ("PerspectiveCamera", "OrthogonalCamera") and tag in ("X", "Y", "Z"):
+            vectors.setdefault(path[-1], {})[tag] = float(elem.text)
+        elif tag == "FieldOfView" and path and path[-1] == "PerspectiveCamera":
+            field_of_view = float(elem.text)
+        elif tag == "ViewToWorldScale" and path and path[-1] == "OrthogonalCamera":
+            view_to_world_scale = float(elem.text)
+        elif len(path) >= 2 and path[-2] == "ClippingPlane" and tag in ("X", "Y", "Z"):
+            plane.setdefault(path[-1], {})[tag] = float(elem.text)
+        elif tag == "ClippingPlane":
+            if "Location" in plane and "Direction" in plane:
+                clipping_planes.append(tuple(tuple(plane[name][axis] for axis in "XYZ") for name in ("Location", "Direction")))
+            plane = {}
+        elif tag == "Component" and elem.get("IfcGuid"):
+            # BCF 3.0 nests the components of a color in a Components element, BCF 2.1 does not
+            if "Selection" in path:
+                selection.append(elem.get("IfcGuid"))
+            elif "Exceptions" in path:
+                visibility_exceptions.append(elem.get("IfcGuid"))
+            elif "Color" in path and coloring:
+                coloring[-1][1].append(elem.get("IfcGuid"))
+        
+        elem.clear()
+    
+    def get_vector(name):
+        vector = vectors[name]
+        return (vector['X'], vector['Y'], vector['Z'])
+    
+    return BCFViewpoint(
+        get_vector('CameraViewPoint'),
+        get_vector('CameraDirection'),
+        get_vector('CameraUpVector'),
+        field_of_view,
+        BCFComponents(selection, default_visibility, visibility_exceptions, coloring),
+        view_to_world_scale,
+        clipping_planes
     )
 
-    camera_direction = (
-        float(direction.find('X').text),
-        float(direction.find('Y').text),
-        float(direction.find('Z').text)
-    )
+# split a path that points into a .bcfzip archive into the archive and the member
 
-    camera_up_vector = (
-        float(up_vector.find('X').text),
-        float(up_vector.find('Y').text),
-        float(up_vector.find('Z').text)
-    )
+def split_bcf_archive_path(path):
     
-    field_of_view = float(field_of_view_bcf.find('FieldOfView').text)
+    archive_path = os.path.dirname(path)
+    member = os.path.basename(path)
     
-    # create camera in blender
-    camera_data = bpy.data.cameras.new(name='Camera')
-    camera_object = bpy.data.objects.new('Camera', camera_data)
-    bpy.context.scene.collection.objects.link(camera_object)
+    while not os.path.isfile(archive_path):
+        parent = os.path.dirname(archive_path)
+        if parent == archive_path:
+            return None, None
+        member = os.path.basename(archive_path) + "/" + member
+        archive_path = parent
     
-    camera_object.location = camera_location
+    return archive_path, member
 
-    # calculate rotation matrix
-    forward = Vector(camera_direction).normalized()
-    up = Vector(camera_up_vector).normalized()
-    right = forward.cross(up).normalized()
-    up_corrected = right.cross(forward).normalized()
+# open a file on disk or a member of a .bcfzip archive
+
+def open_bcf_path(path):
     
-    rotation_matrix = Matrix((
-        right,
-        up_corrected,
-        -forward
-    )).transposed().to_4x4()
+    if os.path.isfile(path):
+        return open(path, 'rb')
     
-    camera_object.matrix_world = rotation_matrix
-    camera_object.location = camera_location
-
-    camera_data.angle = math.radians(field_of_view)
+    archive_path, member = split_bcf_archive_path(path)
+    if archive_path is None or not zipfile.is_zipfile(archive_path):
+        raise FileNotFoundError(path)
     
-    # camera name
-    camera_object.name = "Camera Issue"
-    bpy.context.view_layer.objects.active = camera_object
-    camera = camera_object
+    archive = zipfile.ZipFile(archive_path)
+    try:
+        stream = archive.open(member)
+    except KeyError:
+        archive.close()
+        raise FileNotFoundError(path)
     
-    # set resolution
-    img = bpy.data.images.load(absolute_snapshot_path)
-    width = img.size[0]
-    height = img.size[1]
-    bpy.context.scene.render.resolution_x = width
-    bpy.context.scene.render.resolution_y = height
-    bpy.context.scene.render.pixel_aspect_x = 1.0
-    bpy.context.scene.render.pixel_aspect_y = 1.0
-        
-    camera_name = "Camera Issue"
-    bpy.context.scene.camera = camera
+    # the member keeps the archive open until it is closed itself
+    archive.close()
+    return stream
+
+# load an image from disk or from a .bcfzip archive without extracting it
+
+def load_bcf_image(path):
     
-    for area in bpy.context.screen.areas:
-        if area.type == 'VIEW_3D':
-            for space in area.spaces:
-                if space.type == 'VIEW_3D':
-                    space.region_3d.view_perspective = 'CAMERA'
+    if os.path.isfile(path):
+        return bpy.data.images.load(path)
     
-    # is this the right way to adjust the Perspective of the picture?
-    if context.scene.focal_length.value !=0:
-        camera.data.lens = context.scene.focal_length.value
-    if context.scene.sensor_width.value !=0:
-        camera.data.sensor_width = context.scene.sensor_width.value
+    with open_bcf_path(path) as stream:
+        data = stream.read()
     
-    return camera, camera_name, absolute_snapshot_path
-                                 
-# get the closeset objekt in fromt of the camera
+    image = bpy.data.images.new(os.path.basename(path), width=1, height=1)
+    image.pack(data=data, data_len=len(data))
+    image.source = 'FILE'
+    return image
 
-def get_first_object_in_view(camera):
-    
-    scene = bpy.context.scene
-    depsgraph = bpy.context.evaluated_depsgraph_get()
+# hash the bytes of a file on disk or in a .bcfzip archive, hashes are kept until the file changes
 
-    # cameramatrix and origin
-    cam_matrix = camera.matrix_world.normalized()
-    cam_origin = cam_matrix.to_translation()
-    cam_forward = cam_matrix.to_3x3() @ mathutils.Vector((0.0, 0.0, -1.0))
-
-    # set origin and ray direction
-    ray_origin = cam_origin
-    ray_direction = cam_forward
-
-    closest_obj = None
-    closest_distance = float('inf')
-        
-    # get the closest object
-    for obj in scene.objects:
-        if obj.type == 'MESH' and obj.visible_get():
-            obj_eval = obj.evaluated_get(depsgraph)
-            # check if the object can be evaluated
-            if obj_eval:
-                matrix = obj.matrix_world.inverted()
-                ray_origin_local = matrix @ ray_origin
-                ray_direction_local = matrix.to_3x3() @ ray_direction
-
-                success, location, normal, face_index = obj_eval.ray_cast(ray_origin_local, ray_direction_local)
-                if success:
-                    distance = (location - ray_origin_local).length
-                    if distance < closest_distance:
-                        closest_distance = distance
-                        closest_obj = obj
-            else:
-                print("Warning: The object '{}' can not be evaluated.".format(obj.name))
+file_hash_cache = {}
 
-    return closest_obj
+def get_file_hash(path):
+    
+    archive_path = path if os.path.isfile(path) else split_bcf_archive_path(path)[0]
+    stat = os.stat(archive_path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    
+    if key not in file_hash_cache:
+        digest = hashlib.sha1()
+        with open_bcf_path(path) as stream:
+            for chunk in iter(lambda: stream.read(1 << 20), b""):
+                digest.update(chunk)
+        file_hash_cache[key] = digest.hexdigest()
+    
+    return file_hash_cache[key]
 
-# get the main face of the closest object to create a face for projection
+# read the size of a PNG or JPEG image from its header without decoding it
 
-def get_largest_visible_face(camera, obj):    
-    scene = bpy.context.scene
-    depsgraph = bpy.context.evaluated_depsgraph_get()
+jpeg_size_markers = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
 
-    # get camera information
-    cam_matrix = camera.matrix_world.normalized()
-    cam_origin = cam_matrix.to_translation()
-    cam_forward = cam_matrix.to_3x3() @ mathutils.Vector((0.0, 0.0, -1.0))
+def read_image_size(path):
+    
+    with open_bcf_path(path) as stream:
+        header = stream.read(24)
         
-    # get object information relative to camera
-    matrix = obj.matrix_world.inverted()
-    ray_origin_local = matrix @ cam_origin
-    ray_direction_local = matrix.to_3x3() @ cam_forward
-
-    obj_eval = obj.evaluated_get(depsgraph)
-    largest_face = None
-    largest_area = 0
-        
-    # get the face with the greatest area in the scene
-    for poly in obj_eval.data.polygons:
-        success, location, normal, face_index = obj_eval.ray_cast(ray_origin_local, ray_direction_local)
-        if success and face_index == poly.index:
-            area = poly.area
-            if area > largest_area:
-                largest_area = area
-                largest_face = poly
-                
-    return largest_face
+        # PNG: the IHDR chunk directly follows the signature
+        if header[:8] == b"\x89PNG\r\n\x1a\n" and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+        
+        # JPEG: walk the segments until a start of frame marker
+        if header[:2] == b"\xff\xd8":
+            stream.seek(2)
+            while True:
+                byte = stream.read(1)
+                if not byte:
+                    break
+                if byte != b"\xff":
+                    continue
+                marker = stream.read(1)
+                while marker == b"\xff":
+                    marker = stream.read(1)
+                if not marker:
+                    break
+                marker = marker[0]
+                # markers without a segment
+                if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+                    continue
+                length = struct.unpack(">H", stream.read(2))[0]
+                if marker in jpeg_size_markers:
+                    height, width = struct.unpack(">xHH", stream.read(5))
+                    return width, height
+                stream.seek(length - 2, os.SEEK_CUR)
+    
+    return None
 
-# get faces with similar normal vectors
+# reuse a loaded snapshot with the same content instead of loading it again
 
-def get_face_with_similar_normal(obj, largest_face):
+def get_snapshot_image(path):
+    
+    key = get_file_hash(path)
+    for image in bpy.data.images:
+        if image.get(cache_key_property) == key:
+            return image
+    
+    image = load_bcf_image(path)
+    image[cache_key_property] = key
+    return image
 
-    obj_data = obj.data
-    largest_normal = largest_face.normal
-    selected_faces = []
+# get the snapshot and viewpoint path of a topic inside a .bcfzip archive
 
-    # compare every face of the object
-    for face in obj_data.polygons:
-        if face == largest_face:
+def get_bcf_topic_paths(archive_path, topic_guid):
+    
+    for topic in iter_bcf_topics(archive_path):
+        if topic_guid and topic.guid != topic_guid:
             continue
+        return get_bcf_viewpoint_paths(archive_path, topic)
+    
+    raise LookupError(f"No topic '{topic_guid}' found in '{archive_path}'.")
 
-        # get the face normal
-        normal = face.normal
+# performance log of the stages of an issue, written as one JSON line per issue into the image folder
 
-        # compare face normal
-        if (largest_normal - normal).length < 0.001:
-            selected_faces.append(face.index)
+current_issue_profile = None
+last_issue_profile = None
 
-    for face_index in selected_faces:
-        obj.data.polygons[face_index].select = True
+@contextmanager
+def profile_issue(context, issue):
+    
+    global current_issue_profile, last_issue_profile
+    
+    # stages of nested main functions belong to the outer issue
+    if current_issue_profile is not None:
+        yield current_issue_profile
+        return
+    
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    
+    profile = {"issue": issue, "time": datetime.now().isoformat(timespec="seconds"), "success": False, "peak_memory": 0, "stages": []}
+    current_issue_profile = profile
+    start = time.perf_counter()
+    
+    try:
+        yield profile
+        profile["success"] = True
+    finally:
+        profile["seconds"] = time.perf_counter() - start
+        profile["peak_memory"] = max(profile["peak_memory"], tracemalloc.get_traced_memory()[1])
+        if not tracing:
+            tracemalloc.stop()
+        current_issue_profile = None
+        last_issue_profile = profile
+        write_issue_profile(context, profile)
+
+@contextmanager
+def profile_stage(name):
+    
+    # counts and sizes of the stage are added to the yielded record
+    stage = {"name": name}
+    profile = current_issue_profile
+    if profile is None:
+        yield stage
+        return
+    
+    # the peak before the stage still counts for the issue
+    profile["peak_memory"] = max(profile["peak_memory"], tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    
+    try:
+        yield stage
+    finally:
+        stage["seconds"] = time.perf_counter() - start
+        stage["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        profile["peak_memory"] = max(profile["peak_memory"], stage["peak_memory"])
+        profile["stages"].append(stage)
+
+def write_issue_profile(context, profile):
+    
+    # readout of the last run in the panel
+    context.scene.bcf_last_profile = json.dumps(profile)
+    
+    try:
+        with open(os.path.join(get_image_folder_path(), "performance_log.jsonl"), 'a') as log:
+            log.write(json.dumps(profile) + "\n")
+    except OSError as e:
+        print(f"Error: {e}")
 
-    return selected_faces
-        
-# creating a projection face of the object in the center
+# helpers that work on the data and do not need a 3D viewport, so the add-on runs with blender --background
 
-def create_mesh_from_faces(similar_faces, obj, distance, number_cuts):
-        
-    # create a new mesh
-    mesh = bpy.data.meshes.new("NewMesh")
-    new_obj = bpy.data.objects.new("NewFace", mesh)
-    bpy.context.collection.objects.link(new_obj)
+def is_headless():
+    return bpy.app.background or bpy.context.screen is None
 
-    bm = bmesh.new()
+def set_view_to_camera():
+    
+    # there is no view to change without a window
+    if is_headless():
+        return
+    
+    for area in bpy.context.screen.areas:
+        if area.type == 'VIEW_3D':
+            for space in area.spaces:
+                if space.type == 'VIEW_3D':
+                    space.region_3d.view_perspective = 'CAMERA'
 
-    for face_index in similar_faces:
-        face = obj.data.polygons[face_index]
+def ensure_object_mode():
+    if bpy.context.object and bpy.context.object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
 
-        vertices = [obj.matrix_world @ obj.data.vertices[vert_idx].co for vert_idx in face.vertices]
-        bm_verts = [bm.verts.new(vert) for vert in vertices]
+def deselect_all():
+    for obj in bpy.context.view_layer.objects.selected:
+        obj.select_set(False)
+
+def remove_objects(objects):
+    for obj in objects:
+        data = obj.data
+        bpy.data.objects.remove(obj, do_unlink=True)
+        # remove the mesh or camera data if nothing else uses it
+        if data is not None and data.users == 0:
+            if isinstance(data, bpy.types.Mesh):
+                bpy.data.meshes.remove(data)
+            elif isinstance(data, bpy.types.Camera):
+                bpy.data.cameras.remove(data)
 
-        bm.faces.new(bm_verts)
-        bm.faces.ensure_lookup_table()
+# create camera with bcf data via file path
 
-    bm.to_mesh(mesh)
-    bm.free()
+def get_issue_paths(context):
     
-    # subdivide surface
-    bpy.context.view_layer.objects.active = new_obj
-    new_obj.select_set(True)
+    # find absolute path
+    absolute_path = bpy.path.abspath(context.scene.import_filepath)
+    
+    if zipfile.is_zipfile(absolute_path):
+        # read the topic straight out of the .bcfzip archive
+        return get_bcf_topic_paths(absolute_path, context.scene.bcf_topic_guid)
+    
+    # path to XML_File
+    absolute_snapshot_path = absolute_path
+
+    base_path = os.path.dirname(absolute_snapshot_path)
 
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action='SELECT')
-    # create triangular faces to prevent a bad image outcome
-    bpy.ops.mesh.quads_convert_to_tris(quad_method='BEAUTY', ngon_method='BEAUTY')
-    bpy.ops.mesh.subdivide(number_cuts=number_cuts)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    # get relative path to viewpoint and snapshot 
+    viewpoint_path = "viewpoint.bcfv"
+            
+    # create absolute path to the files
+    absolute_viewpoint_path = os.path.join(base_path, viewpoint_path)
     
-    newmesh = bpy.data.meshes.new("NewMesh")
-    annotation_obj = bpy.data.objects.new("AnnotationLayer", newmesh)
-    bpy.context.collection.objects.link(annotation_obj)
+    return absolute_snapshot_path, absolute_viewpoint_path
 
-    bm = bmesh.new()
+# read the viewpoint and the snapshot size of an issue, this does not touch bpy and can run in another thread
 
-    for face_index in similar_faces:
-        face = obj.data.polygons[face_index]
+def read_issue_files(absolute_snapshot_path, absolute_viewpoint_path):
+    
+    with open_bcf_path(absolute_viewpoint_path) as stream:
+        viewpoint = read_bcf_viewpoint(stream)
+    
+    size = read_image_size(absolute_snapshot_path)
+    
+    # the snapshot hash is needed later to find a loaded snapshot
+    get_file_hash(absolute_snapshot_path)
+    
+    return viewpoint, size
 
-        vertices = [obj.matrix_world @ obj.data.vertices[vert_idx].co for vert_idx in face.vertices]
-        bm_verts = [bm.verts.new(vert) for vert in vertices]
+def main_create_camera_with_BCF_data(context, absolute_snapshot_path=None, absolute_viewpoint_path=None, issue_files=None):
+    
+    # use the issue of the scene settings if no paths are given
+    if absolute_snapshot_path is None:
+        absolute_snapshot_path, absolute_viewpoint_path = get_issue_paths(context)
+    
+    with profile_issue(context, absolute_snapshot_path):
+        
+        # extract data
+        if issue_files is None:
+            with profile_stage("parse viewpoint"):
+                issue_files = read_issue_files(absolute_snapshot_path, absolute_viewpoint_path)
+        viewpoint, size = issue_files
+
+        # visibility, selection and coloring of the issue, the components of the previous issue are undone
+        if context.scene.bcf_apply_components:
+            with profile_stage("components") as stage:
+                stage.update(apply_bcf_components(viewpoint.components, context.view_layer))
+        else:
+            restore_bcf_components(context.view_layer)
 
-        bm.faces.new(bm_verts)
-        bm.faces.ensure_lookup_table()
+        camera_location = viewpoint.camera_location
+        camera_direction = viewpoint.camera_direction
+        camera_up_vector = viewpoint.camera_up_vector
+        field_of_view = viewpoint.field_of_view
+        
+        with profile_stage("create camera"):
+            # create camera in blender
+            camera_data = bpy.data.cameras.new(name='Camera')
+            camera_object = bpy.data.objects.new('Camera', camera_data)
+            bpy.context.scene.collection.objects.link(camera_object)
+            
+            camera_object.location = camera_location
 
-        # normal direction
-        normal = face.normal.normalized()
-        normal_world = obj.matrix_world.to_3x3() @ normal
+            # calculate rotation matrix
+            forward = Vector(camera_direction).normalized()
+            up = Vector(camera_up_vector).normalized()
+            right = forward.cross(up).normalized()
+            up_corrected = right.cross(forward).normalized()
+            
+            rotation_matrix = Matrix((
+                right,
+                up_corrected,
+                -forward
+            )).transposed().to_4x4()
+            
+            camera_object.matrix_world = rotation_matrix
+            camera_object.location = camera_location
+
+            if viewpoint.view_to_world_scale is not None:
+                # the scale of an orthogonal camera is the visible height of the view
+                camera_data.type = 'ORTHO'
+                camera_data.sensor_fit = 'VERTICAL'
+                camera_data.ortho_scale = viewpoint.view_to_world_scale
+            else:
+                camera_data.angle = math.radians(field_of_view)
+            
+            # the section planes of the issue are used by the search of the visible faces
+            camera_object[clipping_planes_property] = [value for plane in viewpoint.clipping_planes for vector in plane for value in vector]
+            
+            # camera name
+            camera_object.name = "Camera Issue"
+            bpy.context.view_layer.objects.active = camera_object
+            camera = camera_object
+        
+        with profile_stage("snapshot size") as stage:
+            # set resolution, read from the image header if possible
+            if size is None:
+                try:
+                    size = get_snapshot_image(absolute_snapshot_path).size
+                except Exception:
+                    # the camera is not returned, so nobody else can remove it
+                    remove_objects([camera])
+                    raise
+            width = size[0]
+            height = size[1]
+            bpy.context.scene.render.resolution_x = width
+            bpy.context.scene.render.resolution_y = height
+            bpy.context.scene.render.pixel_aspect_x = 1.0
+            bpy.context.scene.render.pixel_aspect_y = 1.0
+            stage["image_size"] = [width, height]
+            
+        camera_name = "Camera Issue"
+        bpy.context.scene.camera = camera
+        
+        set_view_to_camera()
+        
+        # is this the right way to adjust the Perspective of the picture?
+        if context.scene.focal_length.value !=0:
+            camera.data.lens = context.scene.focal_length.value
+        if context.scene.sensor_width.value !=0:
+            camera.data.sensor_width = context.scene.sensor_width.value
+    
+    return camera, camera_name, absolute_snapshot_path
+                                 
+# objects created by this add-on are layers on top of the model and are never hit by the ray search
 
-        # new position of face
-        for vert in bm_verts:
-            vert.co += normal_world * distance * 2
-          
-    bm.to_mesh(newmesh)
-    bm.free()        
+def is_issue_layer(obj):
+    return bool(obj.get(issue_layer_property, False))
 
-    return new_obj, annotation_obj
+def mark_issue_layer(obj):
+    obj[issue_layer_property] = True
 
-# create uv perspective from view
+# world-space bounding boxes of all visible meshes in one array, only the rows of changed objects are computed again
 
-def uv_perspective_from_view(new_obj):
+scene_bounds_cache = {"scene": None, "names": [], "rows": {}, "mins": np.empty((0, 3)), "maxs": np.empty((0, 3)), "dirty": set()}
 
-    # make sure the object is in object mode
-    bpy.ops.object.mode_set(mode='OBJECT')
+# world-space BVH of every object, built when an object is hit by the culling for the first time
 
-    # set object to active
-    bpy.context.view_layer.objects.active = new_obj
-    new_obj.select_set(True)
+object_bvh_cache = {}
+
+def get_scene_bvh_objects(scene):
+    return [obj for obj in scene.objects if obj.type == 'MESH' and obj.visible_get() and not is_issue_layer(obj)]
 
-    # change to edit mode
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action = 'SELECT')
+def get_object_bounds(obj, depsgraph):
     
-    bpy.ops.uv.smart_project(rotate_method='AXIS_ALIGNED_Y')
-    bpy.ops.object.mode_set(mode='OBJECT')
+    obj_eval = obj.evaluated_get(depsgraph)
+    matrix = np.array(obj_eval.matrix_world)
+    corners = np.array(obj_eval.bound_box) @ matrix[:3, :3].T + matrix[:3, 3]
+    return corners.min(axis=0), corners.max(axis=0)
+
+def get_scene_bounds(scene, depsgraph):
     
-    uv_map = new_obj.data.uv_layers.new(name="UVMap Project") 
+    cache = scene_bounds_cache
+    objects = get_scene_bvh_objects(scene)
+    names = [obj.name for obj in objects]
     
-    new_obj.data.uv_layers.active_index = len(new_obj.data.uv_layers) - 1  
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action='SELECT')
+    if cache["scene"] != scene.name:
+        cache.update(scene=scene.name, names=[], rows={}, mins=np.empty((0, 3)), maxs=np.empty((0, 3)))
     
-    # this part of the code has been created by Harry McKenzie and was found here https://blender.stackexchange.com/questions/316333/context-is-incorrect-error-from-project-from-view on 7.6.2024
-    #----------------------------------------------------------------------------------------------------------
+    dirty = cache["dirty"]
     
-    area_type = 'VIEW_3D'
-    areas  = [area for area in bpy.context.window.screen.areas if area.type == area_type]
-
-    with bpy.context.temp_override(
-        window=bpy.context.window,
-        area=areas[0],
-        region=[region for region in areas[0].regions if region.type == 'WINDOW'][0],
-        screen=bpy.context.window.screen
-    ):
-        bpy.ops.uv.project_from_view(camera_bounds=True, correct_aspect=False, scale_to_bounds=False)
-    #----------------------------------------------------------------------------------------------------------
+    if names != cache["names"]:
+        # keep the rows of objects that are still visible and did not change, a renamed object is a new row
+        keys = [(obj.name, obj.as_pointer()) for obj in objects]
+        mins = np.empty((len(objects), 3))
+        maxs = np.empty((len(objects), 3))
+        for index, obj in enumerate(objects):
+            row = cache["rows"].get(keys[index])
+            if row is None or obj.name in dirty:
+                mins[index], maxs[index] = get_object_bounds(obj, depsgraph)
+            else:
+                mins[index], maxs[index] = cache["mins"][row], cache["maxs"][row]
+        cache.update(names=names, rows={key: index for index, key in enumerate(keys)}, mins=mins, maxs=maxs)
+    else:
+        for index, obj in enumerate(objects):
+            if obj.name in dirty:
+                cache["mins"][index], cache["maxs"][index] = get_object_bounds(obj, depsgraph)
     
-    bpy.ops.object.mode_set(mode='OBJECT')
+    dirty.clear()
+    return objects, cache["mins"], cache["maxs"]
 
-# adding the picture of the issue as texture
+# the four side planes of the camera, the near and far clipping planes and the clipping planes of the issue
+# normals point into the frustum
 
-def adding_issue_material(obj, absolute_snapshot_path):
+def get_camera_culling_planes(camera, scene):
     
-    # ensure the object is selected and active
-    bpy.context.view_layer.objects.active = obj
-    bpy.context.view_layer.objects.active.select_set(True)
-
-    # create a new material or use the current material
-    if not obj.data.materials:
-        mat = bpy.data.materials.new(name="NewFaceMaterial")
-        obj.data.materials.append(mat)
-    else:
-        mat = obj.data.materials[0]
-
-    mat.use_nodes = True
-    nodes = mat.node_tree.nodes
-    links = mat.node_tree.links
-
-    # clear existing nodes
-    for node in nodes:
-        nodes.remove(node)
+    plane_points, plane_normals = get_camera_frustum_planes(camera, scene)
+    
+    cam_matrix = camera.matrix_world.normalized()
+    origin = np.array(cam_matrix.to_translation())
+    forward = np.array(cam_matrix.to_3x3() @ Vector((0.0, 0.0, -1.0)))
+    
+    # the clipping planes of the issue follow the near and far plane
+    clipping_points, clipping_normals = get_issue_clipping_planes(camera)
+    plane_points = np.vstack((plane_points, origin + forward * camera.data.clip_start, origin + forward * camera.data.clip_end, clipping_points))
+    plane_normals = np.vstack((plane_normals, forward, -forward, clipping_normals))
+    
+    return plane_points, plane_normals
 
-    obj.data.uv_layers.active_index = len(obj.data.uv_layers) - 1  
+# the clipping planes of the issue as points and normals pointing to the visible side
 
-    # add nodes
-    output_node = nodes.new(type='ShaderNodeOutputMaterial')
-    bsdf_node = nodes.new(type='ShaderNodeBsdfPrincipled')
-    texture_node = nodes.new(type='ShaderNodeTexImage')
-    uv_node = nodes.new(type='ShaderNodeUVMap')
-    uv_node.uv_map = obj.data.uv_layers.active.name
+def get_issue_clipping_planes(camera):
     
-    # set alpha value
-    bsdf_node.inputs['Alpha'].default_value = 1
+    values = np.array(camera.get(clipping_planes_property, []), dtype=np.float64).reshape(-1, 2, 3)
+    directions = values[:, 1]
+    lengths = np.linalg.norm(directions, axis=1)
+    values = values[lengths > 0]
+    
+    return values[:, 0], -directions[lengths > 0] / lengths[lengths > 0, None]
 
-    # load the image texture
-    texture_node.image = bpy.data.images.load(absolute_snapshot_path)
-    texture_node.extension = 'CLIP'  
+# the part of every ray that is on the inner side of all planes, as start and end distance
 
-    # connect nodes
-    links.new(bsdf_node.outputs['BSDF'], output_node.inputs['Surface'])
-    links.new(texture_node.outputs['Color'], bsdf_node.inputs['Base Color'])
-    links.new(uv_node.outputs['UV'], texture_node.inputs['Vector'])
+def get_visible_ray_ranges(origins, directions, plane_points, plane_normals):
+    
+    start = np.zeros(len(origins))
+    stop = np.full(len(origins), np.inf)
     
-    bpy.ops.object.mode_set(mode='OBJECT')        
+    for point, normal in zip(plane_points, plane_normals):
+        distances = (origins - point) @ normal
+        speeds = directions @ normal
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing = -distances / speeds
+        start = np.where(speeds > 0, np.maximum(start, crossing), start)
+        stop = np.where(speeds < 0, np.minimum(stop, crossing), stop)
+        # rays parallel to a plane on its clipped side see nothing
+        stop = np.where((speeds == 0) & (distances < 0), -np.inf, stop)
+    
+    return start, stop
 
-# find desktop path
-def get_desktop_path():
-    # try to find a OneDrive Desktop path
-    desktop_onedrive = os.path.join(os.path.expanduser("~"), "OneDrive", "Desktop")
-    if os.path.exists(desktop_onedrive):
-        print(f"OneDrive desktop path found: {desktop_onedrive}")
-        return desktop_onedrive
+# keep the boxes that are at least partly on the inner side of every plane
+# the corner of a box that is farthest along a plane normal decides if the box is outside of the plane
 
-    # try to find a standard Desktop path
-    desktop_standard = os.path.join(os.path.expanduser("~"), "Desktop")
-    if os.path.exists(desktop_standard):
-        print(f"Standard desktop path found: {desktop_standard}")
-        return desktop_standard
+def cull_boxes(mins, maxs, plane_points, plane_normals):
+    
+    corners = np.where(plane_normals[None, :, :] > 0, maxs[:, None, :], mins[:, None, :])
+    distances = np.einsum("bpk,pk->bp", corners - plane_points[None, :, :], plane_normals)
+    return np.all(distances >= 0, axis=1)
 
-    # path not found
-    print("No desktop path found.")
-    return None
+# the mesh objects in the camera view, sorted by the distance of their boxes from the camera
 
-# create a new image texture of the projection face to replace it with a face of lower point amount
+def get_frustum_candidates(camera, scene, depsgraph):
+    
+    objects, mins, maxs = get_scene_bounds(scene, depsgraph)
+    if not objects:
+        return [], mins, maxs
     
-def get_image_from_orthogonal_view(obj):
+    plane_points, plane_normals = get_camera_culling_planes(camera, scene)
+    inside = np.flatnonzero(cull_boxes(mins, maxs, plane_points, plane_normals))
     
-    # get the absolute path to the desktop
-    desktop_path = get_desktop_path()
+    # nearest corner of every box along the view direction
+    origin, forward = plane_points[4], plane_normals[4]
+    near = (np.where(forward > 0, mins[inside], maxs[inside]) - origin) @ forward
+    order = inside[np.argsort(near)]
+    
+    return [objects[index] for index in order], mins[order], maxs[order]
 
-    # check if a path was found
-    if desktop_path:
-        # path for the new folder on the desktop
-        folder_path = os.path.join(desktop_path, "BCFIssueViewImages")
-        print(f"Full folder path: {folder_path}")  # Debug output
+# distances where rays enter boxes, inf if a ray misses a box
 
-        # create the folder if it does not exist
-        try:
-            if not os.path.exists(folder_path):
-                os.makedirs(folder_path)
-            print(f"Directory '{folder_path}' successfully created.")
-        except PermissionError as e:
-            print(f"Error: Access denied for '{folder_path}'. Check the permissions.")
-        except OSError as e:
-            print(f"Error: {e}")
-    else:
-        print("Desktop path could not be determined.")
-        
-    # ensure the object is selected and active
-    bpy.context.view_layer.objects.active = obj
-    obj.select_set(True)   
-    bpy.ops.object.mode_set(mode='OBJECT')  
+def intersect_ray_boxes(origins, directions, mins, maxs):
+    
+    # one slab after the other, so only arrays of rays times boxes are allocated
+    entry = np.zeros((len(origins), len(mins)))
+    exit = np.full((len(origins), len(mins)), np.inf)
+    
+    for axis in range(3):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse = 1.0 / directions[:, axis, None]
+            t1 = mins[None, :, axis] - origins[:, axis, None]
+            t1 *= inverse
+            t2 = maxs[None, :, axis] - origins[:, axis, None]
+            t2 *= inverse
         
-    # set the new uv map as active
-    obj.data.uv_layers.active_index = 0
-
-    # create a blanck texture
-    new_image = bpy.data.images.new(name="New_Image_Projection_Orthogonal", width=4096, height=4096)
+        # nan of rays parallel to a slab is ignored by fmin and fmax
+        np.fmax(entry, np.fmin(t1, t2), out=entry)
+        np.fmin(exit, np.fmax(t1, t2, out=t1), out=exit)
+    
+    entry[exit < entry] = np.inf
+    return entry
 
-    # set the new texture in material to make changes to the image texture
-    if obj.data.materials:
-        material = obj.data.materials[0]
-    else:
-        material = bpy.data.materials.new(name="Material")
-        obj.data.materials.append(material)
+# world-space vertices, triangles and their polygon indices of the evaluated mesh of an object
 
-    if not material.use_nodes:
-        material.use_nodes = True
+def get_object_triangles(obj, depsgraph):
+    
+    obj_eval = obj.evaluated_get(depsgraph)
+    # check if the object can be evaluated
+    if not obj_eval:
+        print("Warning: The object '{}' can not be evaluated.".format(obj.name))
+        return None, None, None
+    
+    mesh = obj_eval.data
+    triangle_count = len(mesh.loop_triangles)
+    if not triangle_count:
+        return None, None, None
+    
+    # vertices in world space
+    vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", vertices)
+    matrix = np.array(obj_eval.matrix_world)
+    vertices = vertices.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+    
+    triangles = np.empty(triangle_count * 3, dtype=np.int64)
+    mesh.loop_triangles.foreach_get("vertices", triangles)
+    polygons = np.empty(triangle_count, dtype=np.int64)
+    mesh.loop_triangles.foreach_get("polygon_index", polygons)
+    
+    return vertices, triangles.reshape(-1, 3), polygons
 
-    nodes = material.node_tree.nodes
-    texture_node = nodes.new(type='ShaderNodeTexImage')
-    texture_node.image = new_image
-    material.node_tree.nodes.active = texture_node
-    
-    # set render engine to cycles and prepare baking
-    bpy.context.scene.render.engine = 'CYCLES'
-    bpy.context.scene.cycles.samples = 1
-    bpy.context.scene.render.bake.use_pass_direct = False
-    bpy.context.scene.render.bake.use_pass_indirect = False
-    bpy.context.scene.render.bake.use_pass_color = True
-    bpy.context.scene.render.bake.margin = 0
-    bpy.context.view_layer.objects.active = obj 
-    bpy.ops.object.bake(type='DIFFUSE')
-    
-    # save the baked image to a file
-    # create a unique name with time
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-    file_name = f"image_projection_{timestamp}.png"
-    file_path = os.path.join(folder_path, file_name)
-    new_image.filepath_raw = file_path
-    new_image.file_format = 'PNG'
-    new_image.save()
+def build_object_bvh(obj, depsgraph):
     
-    obj.data.uv_layers.active_index = len(obj.data.uv_layers) - 1  
+    vertices, triangles, polygons = get_object_triangles(obj, depsgraph)
+    if vertices is None:
+        return None, None
     
-    return file_path, folder_path
+    tree = BVHTree.FromPolygons(vertices.tolist(), triangles.tolist(), all_triangles=True)
+    return tree, polygons
+
+def get_object_bvh(obj, depsgraph):
+    
+    # the pointer tells apart a new object with the name of a removed one
+    cached = object_bvh_cache.get(obj.name)
+    if cached is None or cached[0] != obj.as_pointer():
+        cached = (obj.as_pointer(), *build_object_bvh(obj, depsgraph))
+        object_bvh_cache[obj.name] = cached
+    return cached[1:]
 
-# create a face that fits to the colored part of the image
+# cast rays at the candidate objects, the boxes a ray enters are tested from near to far
+# and the search stops at the first box that is farther away than the closest hit
 
-def create_and_adjust_projection_face(similar_faces, obj, distance, image, source, camera):
+# with clipping planes only the part of a ray on the visible side is cast, it starts at the first plane it passes
 
-    bpy.ops.object.mode_set(mode='OBJECT')
-    bpy.ops.object.select_all(action='DESELECT')
+def ray_cast_candidates(candidates, mins, maxs, origins, directions, depsgraph, chunk_size=None, clipping_planes=None):
     
-    # create a face
+    hits = [(None, None, None, None)] * len(origins)
+    if not candidates:
+        return hits
     
-    mesh = bpy.data.meshes.new("NewMesh")
-    new_obj = bpy.data.objects.new("ProjectionFace", mesh)
-    bpy.context.collection.objects.link(new_obj)
-
+    ray_start = np.zeros(len(origins))
+    ray_stop = np.full(len(origins), np.inf)
+    if clipping_planes is not None and len(clipping_planes[0]):
+        ray_start, ray_stop = get_visible_ray_ranges(origins, directions, *clipping_planes)
+        origins = origins + directions * ray_start[:, None]
+    
+    # the chunk of rays tested against all boxes at once stays within a fixed number of elements
+    if chunk_size is None:
+        chunk_size = max(1, ray_box_chunk_elements // len(mins))
+    
+    for start in range(0, len(origins), chunk_size):
+        entries = intersect_ray_boxes(origins[start:start + chunk_size], directions[start:start + chunk_size], mins, maxs)
+        
+        for ray, ray_entries in enumerate(entries, start):
+            length = ray_stop[ray] - ray_start[ray]
+            if not length > 0:
+                continue
+            
+            origin = Vector(origins[ray])
+            direction = Vector(directions[ray])
+            closest = (None, None, None, min(length, 1e30))
+            
+            entered = np.flatnonzero(np.isfinite(ray_entries))
+            for index in entered[np.argsort(ray_entries[entered])]:
+                if ray_entries[index] > closest[3]:
+                    break
+                tree, polygons = get_object_bvh(candidates[index], depsgraph)
+                if tree is None:
+                    continue
+                location, normal, triangle, distance = tree.ray_cast(origin, direction, closest[3])
+                if triangle is not None and distance < closest[3]:
+                    closest = (candidates[index], int(polygons[triangle]), location, distance)
+            
+            if closest[0] is not None:
+                hits[ray] = closest
+    
+    return hits
+
+@persistent
+def clear_scene_bvh(*args):
+    scene_bounds_cache["scene"] = None
+    scene_bounds_cache["dirty"].clear()
+    object_bvh_cache.clear()
+
+@persistent
+def invalidate_scene_bvh(scene, depsgraph):
+    
+    # an edited mesh also updates the geometry of every object using it, so only the objects are checked
+    for update in depsgraph.updates:
+        if not (update.is_updated_transform or update.is_updated_geometry):
+            continue
+        if isinstance(update.id, bpy.types.Object) and update.id.type == 'MESH' and not is_issue_layer(update.id):
+            # only the box and the BVH of the changed object are built again
+            scene_bounds_cache["dirty"].add(update.id.name)
+            object_bvh_cache.pop(update.id.name, None)
+
+# index from IFC GlobalId to object, built once and kept current by the depsgraph handler
+# the objects are referenced directly, so the index is cleared after loading and undo
+
+ifc_guid_index = {"built": False, "objects": {}}
+
+# the IFC file of BlenderBIM or Bonsai, if one of them is installed and a file is loaded
+
+def get_ifc_file():
+    
+    for module_name in ("bonsai.tool", "blenderbim.tool"):
+        try:
+            return importlib.import_module(module_name).Ifc.get()
+        except (ImportError, AttributeError):
+            continue
+    
+    return None
+
+def get_object_global_id(obj, ifc_file):
+    
+    # objects of BlenderBIM and Bonsai point to their IFC entity
+    properties = getattr(obj, "BIMObjectProperties", None)
+    if ifc_file is not None and properties is not None and properties.ifc_definition_id:
+        try:
+            return ifc_file.by_id(properties.ifc_definition_id).GlobalId
+        except (RuntimeError, AttributeError):
+            pass
+    
+    # other importers store the GlobalId as a custom property
+    for name in ifc_guid_properties:
+        value = obj.get(name)
+        if value:
+            return str(value)
+    
+    return None
+
+def get_ifc_guid_index():
+    
+    if not ifc_guid_index["built"]:
+        ifc_file = get_ifc_file()
+        objects = {}
+        for obj in bpy.data.objects:
+            global_id = get_object_global_id(obj, ifc_file)
+            if global_id:
+                objects[global_id] = obj
+        ifc_guid_index.update(built=True, objects=objects)
+    
+    return ifc_guid_index["objects"]
+
+# get the objects of IFC GUIDs, removed objects are dropped from the index
+
+def get_ifc_objects(global_ids):
+    
+    index = get_ifc_guid_index()
+    objects = []
+    
+    for global_id in global_ids:
+        obj = index.get(global_id)
+        if obj is None:
+            continue
+        try:
+            obj.name
+        except ReferenceError:
+            del index[global_id]
+            continue
+        objects.append(obj)
+    
+    return objects
+
+@persistent
+def clear_ifc_guid_index(*args):
+    ifc_guid_index.update(built=False, objects={})
+
+@persistent
+def update_ifc_guid_index(scene, depsgraph):
+    
+    if not ifc_guid_index["built"]:
+        return
+    
+    ifc_file = None
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Object) and not is_issue_layer(update.id):
+            if ifc_file is None:
+                ifc_file = get_ifc_file()
+            obj = update.id.original
+            global_id = get_object_global_id(obj, ifc_file)
+            if global_id:
+                ifc_guid_index["objects"][global_id] = obj
+
+# parse the hexadecimal RGB or ARGB color of a BCF viewpoint
+
+def get_bcf_color(value):
+    
+    value = value.strip().lstrip("#")
+    alpha = 1.0
+    if len(value) == 8:
+        alpha = int(value[:2], 16) / 255
+        value = value[2:]
+    return (int(value[0:2], 16) / 255, int(value[2:4], 16) / 255, int(value[4:6], 16) / 255, alpha)
+
+# visibility, selection and color of the objects changed by the components of an issue, by object name
+# before they were changed, so the next issue starts from the scene as it was
+
+component_state = {}
+
+def save_component_state(obj, view_layer):
+    if obj.name not in component_state:
+        component_state[obj.name] = (obj.hide_get(view_layer=view_layer), obj.select_get(view_layer=view_layer), tuple(obj.color))
+
+def restore_bcf_components(view_layer):
+    
+    for name, (hidden, selected, color) in component_state.items():
+        obj = bpy.data.objects.get(name)
+        if obj is None or obj.name not in view_layer.objects:
+            continue
+        if obj.hide_get(view_layer=view_layer) != hidden:
+            obj.hide_set(hidden, view_layer=view_layer)
+        obj.select_set(selected, view_layer=view_layer)
+        obj.color = color
+    
+    component_state.clear()
+
+@persistent
+def clear_component_state(*args):
+    component_state.clear()
+
+# show, select and color the IFC components of a viewpoint, the object search only hits visible objects
+# the components of the previous issue are undone first
+
+def apply_bcf_components(components, view_layer):
+    
+    restore_bcf_components(view_layer)
+    
+    counts = {"selected": 0, "hidden": 0, "colored": 0}
+    layer_objects = set(view_layer.objects)
+    
+    if components.default_visibility is not None:
+        exceptions = {obj.name for obj in get_ifc_objects(components.visibility_exceptions)}
+        for obj in get_ifc_objects(list(get_ifc_guid_index())):
+            if obj not in layer_objects:
+                continue
+            hidden = (obj.name in exceptions) == components.default_visibility
+            if obj.hide_get(view_layer=view_layer) != hidden:
+                save_component_state(obj, view_layer)
+                obj.hide_set(hidden, view_layer=view_layer)
+            counts["hidden"] += hidden
+    
+    if components.selection:
+        for obj in view_layer.objects.selected:
+            save_component_state(obj, view_layer)
+            obj.select_set(False, view_layer=view_layer)
+        for obj in get_ifc_objects(components.selection):
+            if obj in layer_objects:
+                save_component_state(obj, view_layer)
+                obj.select_set(True, view_layer=view_layer)
+                counts["selected"] += 1
+    
+    for color, global_ids in components.coloring:
+        if not color:
+            continue
+        rgba = get_bcf_color(color)
+        for obj in get_ifc_objects(global_ids):
+            if obj not in layer_objects:
+                continue
+            save_component_state(obj, view_layer)
+            obj.color = rgba
+            counts["colored"] += 1
+    
+    return counts
+
+# get the world-space ray origins and directions of a grid over the camera frame
+
+def get_camera_grid_rays(camera, scene, grid_size):
+    
+    cam_matrix = np.array(camera.matrix_world.normalized())
+    frame = np.array([tuple(v) for v in camera.data.view_frame(scene=scene)])
+    
+    # the frame corners are ordered top right, bottom right, bottom left, top left
+    top_right, bottom_right, bottom_left, top_left = frame
+    steps = (np.arange(grid_size) + 0.5) / grid_size
+    s, t = np.meshgrid(steps, steps)
+    s = s.reshape(-1, 1)
+    t = t.reshape(-1, 1)
+    points = (bottom_left * (1 - s) + bottom_right * s) * (1 - t) + (top_left * (1 - s) + top_right * s) * t
+    
+    if camera.data.type == 'ORTHO':
+        # parallel rays that start on the camera plane
+        origins = points[:, :2] @ cam_matrix[:3, :2].T + cam_matrix[:3, 3]
+        directions = np.broadcast_to(-cam_matrix[:3, 2], origins.shape).copy()
+    else:
+        directions = points @ cam_matrix[:3, :3].T
+        directions /= np.linalg.norm(directions, axis=1)[:, None]
+        origins = np.broadcast_to(cam_matrix[:3, 3], directions.shape)
+    
+    return origins, directions
+
+# cast a grid of rays across the camera frame and sum the part of the snapshot covered by every face
+
+def get_visible_face_histogram(camera, grid_size=visibility_grid_size):
+    
+    scene = bpy.context.scene
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    candidates, mins, maxs = get_frustum_candidates(camera, scene, depsgraph)
+    
+    origins, directions = get_camera_grid_rays(camera, scene, grid_size)
+    
+    # every ray stands for the same part of the snapshot
+    ray_weight = 1.0 / len(directions)
+    histogram = Counter()
+    
+    for obj, polygon_index, location, distance in ray_cast_candidates(candidates, mins, maxs, origins, directions, depsgraph, clipping_planes=get_issue_clipping_planes(camera)):
+        if obj is not None:
+            histogram[(obj.name, polygon_index)] += ray_weight
+    
+    return histogram
+
+# get the face cluster of an object that covers the greatest part of the snapshot
+# returns the covered part and the visible face of the cluster with the greatest covered part
+
+def get_largest_visible_object_cluster(obj_eval, visible_faces):
+    
+    polygon_indices = np.array([polygon_index for polygon_index, area in visible_faces])
+    areas = np.array([area for polygon_index, area in visible_faces])
+    
+    clusters = get_coplanar_face_clusters(obj_eval.data)[polygon_indices]
+    cluster_areas = np.bincount(clusters, weights=areas)
+    in_largest_cluster = clusters == np.argmax(cluster_areas)
+    
+    # and its face with the greatest visible area
+    largest_face = polygon_indices[in_largest_cluster][np.argmax(areas[in_largest_cluster])]
+    
+    return cluster_areas.max(), int(largest_face)
+
+def get_histogram_faces(histogram):
+    
+    visible_faces = {}
+    for (object_name, polygon_index), area in histogram.items():
+        visible_faces.setdefault(object_name, []).append((polygon_index, area))
+    return visible_faces
+
+# get the object and face of the face cluster that covers the greatest part of the snapshot,
+# a column in front of a wall only wins if it covers more of the snapshot than the wall
+
+def get_largest_visible_cluster(camera, histogram=None):
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    
+    if histogram is None:
+        histogram = get_visible_face_histogram(camera)
+    
+    # a cluster covers at most the part of its object, objects covering less than the best cluster are skipped
+    visible_faces = sorted(get_histogram_faces(histogram).items(), key=lambda item: sum(area for polygon_index, area in item[1]), reverse=True)
+    best_area, best_object, best_face = 0.0, None, None
+    
+    for object_name, faces in visible_faces:
+        if sum(area for polygon_index, area in faces) <= best_area:
+            break
+        obj = bpy.data.objects[object_name]
+        area, largest_face = get_largest_visible_object_cluster(obj.evaluated_get(depsgraph), faces)
+        if area > best_area:
+            best_area, best_object, best_face = area, obj, largest_face
+    
+    if best_object is None:
+        return None, None
+    
+    return best_object, best_object.evaluated_get(depsgraph).data.polygons[best_face]
+
+# label the connected components of a graph given by the edge arrays a and b
+
+def get_connected_components(count, a, b):
+    
+    labels = np.arange(count)
+    
+    while True:
+        label_a = labels[a]
+        label_b = labels[b]
+        different = label_a != label_b
+        if not different.any():
+            break
+        
+        # hook the larger root of every edge to the smaller one
+        label_a = label_a[different]
+        label_b = label_b[different]
+        np.minimum.at(labels, np.maximum(label_a, label_b), np.minimum(label_a, label_b))
+        
+        # shortcut the label chains until every node points to its root
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+    
+    return np.unique(labels, return_inverse=True)[1]
+
+# group the faces of a mesh by quantized normal, plane distance and connectivity
+
+def get_coplanar_face_clusters(mesh):
+    
+    face_count = len(mesh.polygons)
+    normals = np.empty(face_count * 3, dtype=np.float64)
+    centers = np.empty(face_count * 3, dtype=np.float64)
+    loop_totals = np.empty(face_count, dtype=np.int64)
+    mesh.polygons.foreach_get("normal", normals)
+    mesh.polygons.foreach_get("center", centers)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    normals = normals.reshape(-1, 3)
+    centers = centers.reshape(-1, 3)
+    
+    # faces on the same plane share the same key
+    distances = np.einsum("ij,ij->i", normals, centers)
+    keys = np.column_stack((
+        np.round(normals / normal_tolerance),
+        np.round(distances / plane_distance_tolerance)
+    )).astype(np.int64)
+    plane_labels = np.unique(keys, axis=0, return_inverse=True)[1].reshape(-1)
+    
+    # faces that share an edge are neighbours
+    loop_edges = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get("edge_index", loop_edges)
+    loop_faces = np.repeat(np.arange(face_count), loop_totals)
+    order = np.argsort(loop_edges, kind="stable")
+    sorted_edges = loop_edges[order]
+    sorted_faces = loop_faces[order]
+    shared = sorted_edges[1:] == sorted_edges[:-1]
+    a = sorted_faces[:-1][shared]
+    b = sorted_faces[1:][shared]
+    
+    # only neighbours on the same plane are connected
+    same_plane = plane_labels[a] == plane_labels[b]
+    
+    return get_connected_components(face_count, a[same_plane], b[same_plane])
+
+# get faces with similar normal vectors
+
+def get_face_with_similar_normal(obj, largest_face):
+
+    obj_data = obj.data
+    
+    # get the coplanar and connected faces of the largest face
+    clusters = get_coplanar_face_clusters(obj_data)
+    selected = clusters == clusters[largest_face.index]
+    selected_faces = np.flatnonzero(selected).tolist()
+
+    select = np.empty(len(obj_data.polygons), dtype=bool)
+    obj_data.polygons.foreach_get("select", select)
+    obj_data.polygons.foreach_set("select", select | selected)
+
+    return selected_faces
+        
+# the camera data needed to project points, read once so the projection can run outside of the main thread
+
+CameraProjection = namedtuple("CameraProjection", ["matrix", "x_min", "x_max", "y_min", "y_max", "frame_z", "orthographic"])
+
+def get_camera_projection(camera, scene):
+    
+    frame = np.array([tuple(v) for v in camera.data.view_frame(scene=scene)])
+    x_min, y_min = frame[:, :2].min(axis=0)
+    x_max, y_max = frame[:, :2].max(axis=0)
+    
+    return CameraProjection(
+        np.array(camera.matrix_world.normalized().inverted()),
+        x_min, x_max, y_min, y_max,
+        frame[0, 2],
+        camera.data.type == 'ORTHO'
+    )
+
+# project world-space points to the camera view, x and y are 0 to 1 inside the camera frame and z is the depth
+
+def project_points(projection, points):
+    
+    local = np.asarray(points, dtype=np.float64) @ projection.matrix[:3, :3].T + projection.matrix[:3, 3]
+    depth = -local[:, 2]
+    
+    if projection.orthographic:
+        x = local[:, 0]
+        y = local[:, 1]
+    else:
+        # points on the camera plane can not be projected
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = local[:, 0] * projection.frame_z / local[:, 2]
+            y = local[:, 1] * projection.frame_z / local[:, 2]
+    
+    return np.column_stack((
+        (x - projection.x_min) / (projection.x_max - projection.x_min),
+        (y - projection.y_min) / (projection.y_max - projection.y_min),
+        depth
+    ))
+
+# index of the next loop of the same face
+
+def get_loop_successors(loop_totals):
+    
+    loop_starts = np.cumsum(loop_totals) - loop_totals
+    successors = np.arange(loop_totals.sum()) + 1
+    successors[loop_starts + loop_totals - 1] = loop_starts
+    return successors
+
+def select_polygons(loop_vertices, loop_totals, mask):
+    return loop_vertices[np.repeat(mask, loop_totals)], loop_totals[mask]
+
+# merge the connected coplanar faces of a flat layer into one polygon each by tracing the boundary of the faces,
+# clusters with holes or with a boundary that touches itself keep their faces
+
+def simplify_planar_polygons(vertices, loop_vertices, loop_totals):
+    
+    # weld the vertices at the same position, the faces of the annotation layer do not share vertices
+    keys = np.round(vertices / weld_distance).astype(np.int64)
+    first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)[1:]
+    vertices = vertices[first]
+    loop_vertices = inverse.reshape(-1)[loop_vertices]
+    
+    # drop the loops that repeat their vertex and the faces without an area
+    loop_faces = np.repeat(np.arange(len(loop_totals)), loop_totals)
+    repeated = loop_vertices == loop_vertices[get_loop_successors(loop_totals)]
+    loop_vertices = loop_vertices[~repeated]
+    loop_totals = np.bincount(loop_faces[~repeated], minlength=len(loop_totals))
+    loop_vertices, loop_totals = select_polygons(loop_vertices, loop_totals, loop_totals >= 3)
+    
+    loop_starts = np.cumsum(loop_totals) - loop_totals
+    successors = get_loop_successors(loop_totals)
+    points = vertices[loop_vertices]
+    corners = points - np.repeat(points[loop_starts], loop_totals, axis=0)
+    normals = np.add.reduceat(np.cross(corners, corners[successors]), loop_starts) if len(loop_totals) else np.empty((0, 3))
+    areas = np.linalg.norm(normals, axis=1)
+    loop_vertices, loop_totals = select_polygons(loop_vertices, loop_totals, areas > weld_distance ** 2)
+    normals = normals[areas > weld_distance ** 2] / areas[areas > weld_distance ** 2, None]
+    
+    face_count = len(loop_totals)
+    if face_count == 0:
+        return vertices[:0], loop_vertices, loop_totals
+    
+    # faces on the same plane share the same key
+    loop_starts = np.cumsum(loop_totals) - loop_totals
+    successors = get_loop_successors(loop_totals)
+    centers = np.add.reduceat(vertices[loop_vertices], loop_starts) / loop_totals[:, None]
+    distances = np.einsum("ij,ij->i", normals, centers)
+    keys = np.column_stack((
+        np.round(normals / normal_tolerance),
+        np.round(distances / plane_distance_tolerance)
+    )).astype(np.int64)
+    plane_labels = np.unique(keys, axis=0, return_inverse=True)[1].reshape(-1)
+    
+    # faces that share an edge on the same plane are connected
+    loop_faces = np.repeat(np.arange(face_count), loop_totals)
+    starts = loop_vertices
+    ends = loop_vertices[successors]
+    edges, edge_index = np.unique(np.column_stack((np.minimum(starts, ends), np.maximum(starts, ends))), axis=0, return_inverse=True)
+    edge_index = edge_index.reshape(-1)
+    order = np.argsort(edge_index, kind="stable")
+    shared = edge_index[order][1:] == edge_index[order][:-1]
+    a = loop_faces[order][:-1][shared]
+    b = loop_faces[order][1:][shared]
+    same_plane = plane_labels[a] == plane_labels[b]
+    clusters = get_connected_components(face_count, a[same_plane], b[same_plane])
+    cluster_count = clusters.max() + 1
+    
+    # an edge inside a cluster is used in both directions, the remaining loops form the boundary of the cluster
+    directed = (clusters[loop_faces] * len(edges) + edge_index) * 2 + (starts > ends)
+    boundary_loops = np.flatnonzero(~np.isin(directed, directed ^ 1))
+    boundary_clusters = clusters[loop_faces[boundary_loops]]
+    boundary_starts = starts[boundary_loops]
+    count = len(boundary_loops)
+    indices = np.arange(count)
+    
+    # the next boundary edge starts at the end of an edge, a vertex with two outgoing edges is ambiguous
+    start_keys = boundary_clusters * len(vertices) + boundary_starts
+    end_keys = boundary_clusters * len(vertices) + ends[boundary_loops]
+    order = np.argsort(start_keys, kind="stable")
+    sorted_keys = start_keys[order]
+    next_edges = order[np.minimum(np.searchsorted(sorted_keys, end_keys), count - 1)]
+    found = start_keys[next_edges] == end_keys
+    next_edges[~found] = indices[~found]
+    ambiguous = np.zeros(cluster_count, dtype=bool)
+    ambiguous[boundary_clusters[order][1:][sorted_keys[1:] == sorted_keys[:-1]]] = True
+    ambiguous[boundary_clusters[~found]] = True
+    
+    # label every boundary cycle with its smallest edge and count the steps to it by pointer doubling
+    heads = indices.copy()
+    jumps = next_edges.copy()
+    for _ in range(count.bit_length()):
+        heads = np.minimum(heads, heads[jumps])
+        jumps = jumps[jumps]
+    
+    is_head = heads == indices
+    jumps = np.where(is_head, indices, next_edges)
+    steps = (~is_head).astype(np.int64)
+    for _ in range(count.bit_length()):
+        steps = steps + steps[jumps]
+        jumps = jumps[jumps]
+    
+    cycle_lengths = np.bincount(heads, minlength=count)[heads]
+    order = np.lexsort(((cycle_lengths - steps) % cycle_lengths, heads))
+    
+    # a cluster with a single boundary cycle becomes one polygon
+    cycles = np.bincount(boundary_clusters[is_head], minlength=cluster_count)
+    merged = (cycles == 1) & ~ambiguous
+    order = order[merged[boundary_clusters[order]]]
+    cycle_vertices = boundary_starts[order]
+    cycle_heads = heads[order]
+    cycle_starts = np.flatnonzero(np.r_[True, cycle_heads[1:] != cycle_heads[:-1]]) if len(order) else np.empty(0, dtype=np.int64)
+    cycle_totals = np.diff(np.r_[cycle_starts, len(order)])
+    
+    # the corners on a straight boundary are only kept if another polygon uses them
+    cycle_successors = get_loop_successors(cycle_totals)
+    cycle_predecessors = np.empty_like(cycle_successors)
+    cycle_predecessors[cycle_successors] = np.arange(len(cycle_successors))
+    points = vertices[cycle_vertices]
+    incoming = points - points[cycle_predecessors]
+    outgoing = points[cycle_successors] - points
+    straight = (
+        (np.linalg.norm(np.cross(incoming, outgoing), axis=1) <= collinear_tolerance * np.linalg.norm(incoming, axis=1) * np.linalg.norm(outgoing, axis=1))
+        & (np.einsum("ij,ij->i", incoming, outgoing) > 0)
+    )
+    
+    kept_vertices, kept_totals = select_polygons(loop_vertices, loop_totals, ~merged[clusters])
+    uses = np.bincount(np.concatenate((kept_vertices, cycle_vertices)), minlength=len(vertices))
+    removed = straight & (uses[cycle_vertices] == 1)
+    cycle_faces = np.repeat(np.arange(len(cycle_totals)), cycle_totals)
+    cycle_totals = np.bincount(cycle_faces[~removed], minlength=len(cycle_totals))
+    cycle_vertices, cycle_totals = select_polygons(cycle_vertices[~removed], cycle_totals, cycle_totals >= 3)
+    
+    # only the vertices of the polygons remain
+    used, loop_vertices = np.unique(np.concatenate((kept_vertices, cycle_vertices)), return_inverse=True)
+    return vertices[used], loop_vertices.reshape(-1), np.concatenate((kept_totals, cycle_totals))
+
+# replace the faces of a flat mesh with its simplified polygons, returns the vertex count before and after
+
+def simplify_planar_mesh(mesh):
+    
+    before = len(mesh.vertices)
+    vertices = np.empty(before * 3, dtype=np.float64)
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int64)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int64)
+    mesh.vertices.foreach_get("co", vertices)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    
+    vertices, loop_vertices, loop_totals = simplify_planar_polygons(vertices.reshape(-1, 3), loop_vertices, loop_totals)
+    
+    mesh.clear_geometry()
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", vertices.astype(np.float32).ravel())
+    mesh.loops.add(len(loop_vertices))
+    mesh.loops.foreach_set("vertex_index", loop_vertices.astype(np.int32))
+    mesh.polygons.add(len(loop_totals))
+    mesh.polygons.foreach_set("loop_start", (np.cumsum(loop_totals) - loop_totals).astype(np.int32))
+    mesh.update(calc_edges=True)
+    
+    return before, len(vertices)
+
+# simplify a projection or annotation layer once its texture is resampled, the texture carries the detail
+
+def simplify_issue_layer(obj):
+    
+    with profile_stage("simplify") as stage:
+        before, after = simplify_planar_mesh(obj.data)
+        stage["layer"] = obj.name
+        stage["vertices_before"] = before
+        stage["vertices_after"] = after
+    
+    print(f"Simplified '{obj.name}' from {before} to {after} vertices.")
+
+# creating the annotation layer in front of the faces of the object
+
+def create_annotation_layer(similar_faces, obj, distance):
+    
+    newmesh = bpy.data.meshes.new("NewMesh")
+    annotation_obj = bpy.data.objects.new("AnnotationLayer", newmesh)
+    mark_issue_layer(annotation_obj)
+    bpy.context.collection.objects.link(annotation_obj)
+
     bm = bmesh.new()
 
-    for face_index in similar_faces:
-        face = obj.data.polygons[face_index]
+    for face_index in similar_faces:
+        face = obj.data.polygons[face_index]
+
+        vertices = [obj.matrix_world @ obj.data.vertices[vert_idx].co for vert_idx in face.vertices]
+        bm_verts = [bm.verts.new(vert) for vert in vertices]
+
+        bm.faces.new(bm_verts)
+        bm.faces.ensure_lookup_table()
+
+        # normal direction
+        normal = face.normal.normalized()
+        normal_world = obj.matrix_world.to_3x3() @ normal
+
+        # new position of face
+        for vert in bm_verts:
+            vert.co += normal_world * distance * 2
+          
+    bm.to_mesh(newmesh)
+    bm.free()        
+
+    return annotation_obj
+
+# get the world-space vertices of an object
+
+def get_world_vertices(obj):
+    
+    mesh = obj.data
+    vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", vertices)
+    matrix = np.array(obj.matrix_world)
+    return vertices.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+
+# get a planar uv frame of a flat mesh: uv = 0 at the origin and the u and v vectors span the uv range 0 to 1
+
+def get_planar_uv_frame(obj, face_indices=None):
+    
+    mesh = obj.data
+    vertices = get_world_vertices(obj)
+    
+    # area weighted normal of the faces
+    normals = np.empty(len(mesh.polygons) * 3, dtype=np.float64)
+    areas = np.empty(len(mesh.polygons), dtype=np.float64)
+    mesh.polygons.foreach_get("normal", normals)
+    mesh.polygons.foreach_get("area", areas)
+    normals = normals.reshape(-1, 3)
+    
+    # only span the given faces
+    if face_indices is not None:
+        normals = normals[face_indices]
+        areas = areas[face_indices]
+        vertices = vertices[np.unique(np.concatenate([mesh.polygons[face_index].vertices for face_index in face_indices]))]
+    
+    normal = (normals * areas[:, None]).sum(axis=0) @ np.array(obj.matrix_world)[:3, :3].T
+    normal /= np.linalg.norm(normal)
+    
+    # u is horizontal and v points upwards, floors and ceilings use the y axis instead
+    u_axis = np.cross((0.0, 0.0, 1.0), normal)
+    if np.linalg.norm(u_axis) < 1e-6:
+        u_axis = np.cross((0.0, 1.0, 0.0), normal)
+    u_axis /= np.linalg.norm(u_axis)
+    v_axis = np.cross(normal, u_axis)
+    
+    u = vertices @ u_axis
+    v = vertices @ v_axis
+    
+    # the uv range 0 to 1 covers the face, the image size keeps the aspect of the face
+    origin = u_axis * u.min() + v_axis * v.min() + normal * (vertices[0] @ normal)
+    
+    return origin, u_axis * (u.max() - u.min()), v_axis * (v.max() - v.min())
+
+# planar uv frame of faces of an object, moved onto the layer at a distance in front of them
+
+def get_layer_uv_frame(obj, face_indices, distance):
+    
+    origin, u_vector, v_vector = get_planar_uv_frame(obj, face_indices)
+    normal = np.cross(u_vector, v_vector)
+    return origin + normal / np.linalg.norm(normal) * distance, u_vector, v_vector
+
+# store and read the planar uv frame on an object
+
+def set_planar_uv_frame_property(obj, frame):
+    obj[planar_frame_property] = np.concatenate(frame).tolist()
+
+def get_planar_uv_frame_property(obj):
+    values = np.array(obj[planar_frame_property], dtype=np.float64)
+    return values[0:3], values[3:6], values[6:9]
+
+# write the planar projection of every loop into an uv map
+
+def set_uv_from_planar_frame(obj, frame, uv_map):
+    
+    mesh = obj.data
+    origin, u_vector, v_vector = frame
+    vertices = get_world_vertices(obj) - origin
+    
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    
+    uvs = np.column_stack((vertices @ u_vector / (u_vector @ u_vector), vertices @ v_vector / (v_vector @ v_vector)))
+    uv_map.data.foreach_set("uv", uvs[loop_vertices].astype(np.float32).ravel())
+
+# find desktop path
+def get_desktop_path():
+    # try to find a OneDrive Desktop path
+    desktop_onedrive = os.path.join(os.path.expanduser("~"), "OneDrive", "Desktop")
+    if os.path.exists(desktop_onedrive):
+        print(f"OneDrive desktop path found: {desktop_onedrive}")
+        return desktop_onedrive
+
+    # try to find a standard Desktop path
+    desktop_standard = os.path.join(os.path.expanduser("~"), "Desktop")
+    if os.path.exists(desktop_standard):
+        print(f"Standard desktop path found: {desktop_standard}")
+        return desktop_standard
+
+    # path not found
+    print("No desktop path found.")
+    return None
+
+# get the folder for the created images, the desktop is used if no folder is set in the scene
+
+def get_image_folder_path():
+    
+    if bpy.context.scene.bcf_image_folder:
+        folder_path = bpy.path.abspath(bpy.context.scene.bcf_image_folder)
+    else:
+        # get the absolute path to the desktop
+        desktop_path = get_desktop_path()
+        
+        # check if a path was found
+        if desktop_path:
+            # path for the new folder on the desktop
+            folder_path = os.path.join(desktop_path, "BCFIssueViewImages")
+        elif bpy.data.filepath:
+            print("Desktop path could not be determined.")
+            folder_path = bpy.path.abspath("//BCFIssueViewImages")
+        else:
+            print("Desktop path could not be determined.")
+            folder_path = os.path.join(tempfile.gettempdir(), "BCFIssueViewImages")
+    
+    print(f"Full folder path: {folder_path}")  # Debug output
+
+    # create the folder if it does not exist
+    try:
+        if not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+        print(f"Directory '{folder_path}' successfully created.")
+    except PermissionError as e:
+        print(f"Error: Access denied for '{folder_path}'. Check the permissions.")
+    except OSError as e:
+        print(f"Error: {e}")
+    
+    return folder_path
+
+# round a texture size to a power of two or to a multiple of 8
+
+def round_texture_size(size, power_of_two):
+    
+    # ignore rounding noise of the measured size
+    size = max(size, 1) * (1 - 1e-6)
+    if power_of_two:
+        return 2 ** math.ceil(math.log2(size))
+    return 8 * math.ceil(size / 8)
+
+# get the image size that keeps the pixel density of the snapshot on the planar uv frame
+
+def plan_texture_resolution(projection, planar_frame, snapshot_size, max_size, power_of_two, grid_size=16):
+    
+    origin, u_vector, v_vector = planar_frame
+    snapshot_size = np.asarray(snapshot_size, dtype=np.float64)
+    
+    # measure how many snapshot pixels one step along u and v covers, on a grid over the face
+    step = 1.0 / grid_size
+    u, v = np.meshgrid(np.arange(grid_size + 1) * step, np.arange(grid_size + 1) * step)
+    points = origin + u.reshape(-1, 1) * u_vector + v.reshape(-1, 1) * v_vector
+    
+    view = project_points(projection, points)
+    view_u = project_points(projection, points + u_vector * step)
+    view_v = project_points(projection, points + v_vector * step)
+    
+    # only the part of the face that is on the snapshot counts
+    visible = (view[:, 2] > 0) & (view[:, 0] >= 0) & (view[:, 0] <= 1) & (view[:, 1] >= 0) & (view[:, 1] <= 1)
+    if not np.any(visible):
+        return round_texture_size(16, power_of_two), round_texture_size(16, power_of_two)
+    
+    pixels_u = np.linalg.norm((view_u[visible, :2] - view[visible, :2]) * snapshot_size, axis=1).max() * grid_size
+    pixels_v = np.linalg.norm((view_v[visible, :2] - view[visible, :2]) * snapshot_size, axis=1).max() * grid_size
+    
+    # scale both sides by the same factor if the larger side exceeds the limit
+    scale = min(1.0, max_size / max(pixels_u, pixels_v, 1))
+    width = min(round_texture_size(pixels_u * scale, power_of_two), max_size)
+    height = min(round_texture_size(pixels_v * scale, power_of_two), max_size)
+    
+    return int(width), int(height)
+
+def get_planned_texture_resolution(obj, camera):
+    
+    scene = bpy.context.scene
+    settings = scene.texture_resolution
+    width, height = plan_texture_resolution(
+        get_camera_projection(camera, scene),
+        get_planar_uv_frame_property(obj),
+        (scene.render.resolution_x, scene.render.resolution_y),
+        settings.max_size,
+        settings.power_of_two
+    )
+    
+    # show the last choice in the panel
+    settings.last_width = width
+    settings.last_height = height
+    
+    return width, height
+
+# get the pixels of an image as an array of shape (height, width, 4)
+
+def get_image_pixels(image):
+    
+    width, height = image.size
+    pixels = np.empty(width * height * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels.reshape(height, width, 4)
+
+# sample an image at the positions x and y from 0 to 1 with bilinear interpolation, positions outside are transparent
+
+def sample_bilinear(pixels, x, y):
+    
+    height, width = pixels.shape[:2]
+    inside = (x >= 0) & (x <= 1) & (y >= 0) & (y <= 1)
+    
+    # pixel centers are at half pixel positions
+    px = np.clip(np.nan_to_num(x) * width - 0.5, 0, width - 1)
+    py = np.clip(np.nan_to_num(y) * height - 0.5, 0, height - 1)
+    x0 = np.floor(px).astype(np.int64)
+    y0 = np.floor(py).astype(np.int64)
+    x1 = np.minimum(x0 + 1, width - 1)
+    y1 = np.minimum(y0 + 1, height - 1)
+    fx = (px - x0)[:, None]
+    fy = (py - y0)[:, None]
+    
+    top = pixels[y1, x0] * (1 - fx) + pixels[y1, x1] * fx
+    bottom = pixels[y0, x0] * (1 - fx) + pixels[y0, x1] * fx
+    samples = bottom * (1 - fy) + top * fy
+    samples[~inside] = 0
+    
+    return samples
+
+# look up a boolean pixel mask at the positions x and y from 0 to 1, positions outside are False
+
+def sample_mask(mask, x, y):
+    
+    height, width = mask.shape
+    inside = (x >= 0) & (x < 1) & (y >= 0) & (y < 1)
+    px = np.clip(np.nan_to_num(x) * width, 0, width - 1).astype(np.int64)
+    py = np.clip(np.nan_to_num(y) * height, 0, height - 1).astype(np.int64)
+    return inside & mask[py, px]
+
+# map every texel of the planar uv frame to the camera view and sample the snapshot there
+
+def resample_snapshot(snapshot_pixels, projection, planar_frame, width, height, rows=None, mask=None):
+    
+    origin, u_vector, v_vector = planar_frame
+    rows = range(height) if rows is None else rows
+    
+    u = (np.arange(width) + 0.5) / width
+    v = (np.arange(rows.start, rows.stop) + 0.5) / height
+    uu, vv = np.meshgrid(u, v)
+    points = origin + uu.reshape(-1, 1) * u_vector + vv.reshape(-1, 1) * v_vector
+    
+    view = project_points(projection, points)
+    samples = sample_bilinear(snapshot_pixels, view[:, 0], view[:, 1])
+    # texels behind the camera are not part of the snapshot
+    samples[~(view[:, 2] > 0)] = 0
+    
+    # texels where the snapshot shows another surface are left out
+    if mask is not None:
+        samples[~sample_mask(mask, view[:, 0], view[:, 1])] = 0
+    
+    return samples.reshape(len(v), width, 4)
+
+# resample the snapshot in tiles of rows on a thread pool
+
+def resample_snapshot_tiled(snapshot_pixels, projection, planar_frame, width, height, mask=None):
+    
+    result = np.empty((height, width, 4), dtype=np.float32)
+    
+    def resample_tile(start):
+        rows = range(start, min(start + resample_tile_rows, height))
+        result[rows.start:rows.stop] = resample_snapshot(snapshot_pixels, projection, planar_frame, width, height, rows, mask)
+    
+    with ThreadPoolExecutor(resample_threads) as executor:
+        list(executor.map(resample_tile, range(0, height, resample_tile_rows)))
+    
+    return result
+
+# write pixels of shape (height, width, 4) from 0 to 1 as 8 bit RGBA PNG, the first row is the bottom row like in blender
+# the file is written under a temporary name first, so a cached image is always complete
+
+def write_png(file_path, pixels):
+    
+    height, width = pixels.shape[:2]
+    rows = (np.clip(pixels[::-1], 0.0, 1.0) * 255 + 0.5).astype(np.uint8).reshape(height, width * 4)
+    # filter type 0 in front of every row
+    data = np.hstack((np.zeros((height, 1), dtype=np.uint8), rows)).tobytes()
+    
+    def chunk(tag, content):
+        return struct.pack(">I", len(content)) + tag + content + struct.pack(">I", zlib.crc32(tag + content) & 0xffffffff)
+    
+    with open(file_path + ".part", 'wb') as png:
+        png.write(b"\x89PNG\r\n\x1a\n")
+        png.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+        png.write(chunk(b"IDAT", zlib.compress(data, 6)))
+        png.write(chunk(b"IEND", b""))
+    os.replace(file_path + ".part", file_path)
+
+# the content of a projection image only depends on the snapshot, the camera, the planar frame of the face and the image size
+
+def get_projection_cache_key(snapshot_image, projection, planar_frame, image_size, mask=None):
+    
+    digest = hashlib.sha1()
+    
+    if cache_key_property in snapshot_image:
+        digest.update(snapshot_image[cache_key_property].encode())
+    else:
+        digest.update(get_image_pixels(snapshot_image).tobytes())
+    
+    digest.update(np.array(projection.matrix, dtype=np.float64).round(9).tobytes())
+    digest.update(np.array(projection[1:6], dtype=np.float64).round(9).tobytes())
+    digest.update(np.array([projection.orthographic], dtype=np.float64).tobytes())
+    digest.update(np.concatenate(planar_frame).round(9).tobytes())
+    digest.update(np.array(image_size, dtype=np.int64).tobytes())
+    if mask is not None:
+        digest.update(np.array(mask.shape, dtype=np.int64).tobytes())
+        digest.update(np.packbits(mask).tobytes())
+    
+    return digest.hexdigest()
+
+# remove the least recently used projection images until the folder is below the size limit
+# images in use, images referenced by the issue records and the kept paths stay in the folder
+
+def evict_projection_images(folder_path, size_limit, keep=()):
+    
+    paths = [image.filepath for image in bpy.data.images if image.filepath]
+    paths += [record.projection_image for scene in bpy.data.scenes for record in scene.bcf_issues if record.projection_image]
+    paths += list(keep)
+    used = {os.path.normcase(os.path.abspath(bpy.path.abspath(path))) for path in paths}
+    entries = [entry for entry in os.scandir(folder_path) if entry.is_file() and entry.name.startswith("image_projection_") and entry.name.endswith(".png")]
+    total_size = sum(entry.stat().st_size for entry in entries)
+    
+    for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+        if total_size <= size_limit:
+            break
+        if os.path.normcase(os.path.abspath(entry.path)) in used:
+            continue
+        total_size -= entry.stat().st_size
+        os.remove(entry.path)
+        print(f"Cached projection image '{entry.name}' removed.")
+
+# get the image of the first image texture node in the material of an object
+
+def get_material_image(obj):
+    return next(node.image for node in obj.data.materials[0].node_tree.nodes if node.type == 'TEX_IMAGE' and node.image)
+
+# resample the snapshot seen by the camera into an image of the planar uv frame, images with the same content are reused
+
+def bake_projection_image(snapshot_image, camera, planar_frame, image_size, mask=None):
+    return run_issue_steps(bake_projection_image_steps(snapshot_image, camera, planar_frame, image_size, mask))
+
+def bake_projection_image_steps(snapshot_image, camera, planar_frame, image_size, mask=None):
+    
+    folder_path = get_image_folder_path()
+    projection = get_camera_projection(camera, bpy.context.scene)
+    width, height = image_size
+    
+    # an image with the same content has already been created
+    cache_key = get_projection_cache_key(snapshot_image, projection, planar_frame, image_size, mask)
+    file_name = f"image_projection_{cache_key}.png"
+    file_path = os.path.join(folder_path, file_name)
+    
+    if os.path.isfile(file_path):
+        print(f"Cached projection image '{file_name}' used.")
+        os.utime(file_path)
+    else:
+        snapshot_pixels = get_image_pixels(snapshot_image)
+        
+        # resample the snapshot into the planar uv map instead of baking it and save it as PNG, neither needs bpy
+        yield lambda: write_png(file_path, resample_snapshot_tiled(snapshot_pixels, projection, planar_frame, width, height, mask))
+        
+        # the workers of the issue farm share the folder, it is cleaned up by the coordinator
+        if projection_cache_eviction:
+            evict_projection_images(folder_path, bpy.context.scene.bcf_cache_size_limit * 1024 * 1024, [file_path])
+    
+    return file_path, folder_path
+
+# get the side planes of the camera frustum as points and normals pointing into the frustum
+
+def get_camera_frustum_planes(camera, scene):
+    
+    cam_matrix = camera.matrix_world.normalized()
+    corners = [cam_matrix @ v for v in camera.data.view_frame(scene=scene)]
+    origin = cam_matrix.to_translation()
+    forward = cam_matrix.to_3x3() @ Vector((0.0, 0.0, -1.0))
+    center = sum(corners, Vector()) / 4
+    
+    points = []
+    normals = []
+    for i in range(4):
+        a = corners[i]
+        b = corners[(i + 1) % 4]
+        # the planes contain the frame edges and the view rays through them
+        direction = forward if camera.data.type == 'ORTHO' else a - origin
+        normal = (b - a).cross(direction).normalized()
+        if normal.dot(center - a) < 0:
+            normal = -normal
+        points.append(tuple(a))
+        normals.append(tuple(normal))
+    
+    return np.array(points), np.array(normals)
+
+# clip a polygon against planes with Sutherland-Hodgman, the part on the normal side of every plane is kept
+
+def clip_polygon(polygon, plane_points, plane_normals):
+    
+    for point, normal in zip(plane_points, plane_normals):
+        if len(polygon) == 0:
+            break
+        
+        distances = (polygon - point) @ normal
+        clipped = []
+        for i in range(len(polygon)):
+            current_distance = distances[i]
+            previous_distance = distances[i - 1]
+            if (current_distance >= 0) != (previous_distance >= 0):
+                factor = previous_distance / (previous_distance - current_distance)
+                clipped.append(polygon[i - 1] + (polygon[i] - polygon[i - 1]) * factor)
+            if current_distance >= 0:
+                clipped.append(polygon[i])
+        polygon = np.array(clipped).reshape(-1, 3)
+    
+    return polygon
+
+# world-space triangles of the candidate objects with the index of their object and polygon
+
+def get_view_triangles(candidates, depsgraph):
+    
+    triangle_arrays = []
+    triangle_objects = []
+    triangle_polygons = []
+    
+    for index, obj in enumerate(candidates):
+        vertices, triangles, polygons = get_object_triangles(obj, depsgraph)
+        if vertices is None:
+            continue
+        triangle_arrays.append(vertices[triangles])
+        triangle_objects.append(np.full(len(triangles), index, dtype=np.int64))
+        triangle_polygons.append(polygons)
+    
+    if not triangle_arrays:
+        return np.empty((0, 3, 3)), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    
+    return np.concatenate(triangle_arrays), np.concatenate(triangle_objects), np.concatenate(triangle_polygons)
+
+# cut the triangles at planes, the parts on the back side of a plane are removed
+# returns the triangles and the index of the original triangle of every triangle
+
+def clip_triangles(triangles, plane_points, plane_normals):
+    
+    sources = np.arange(len(triangles))
+    
+    for plane_point, plane_normal in zip(plane_points, plane_normals):
+        in_front = (triangles - plane_point) @ plane_normal >= 0
+        
+        whole = np.flatnonzero(in_front.all(axis=1))
+        crossing = np.flatnonzero(in_front.any(axis=1) & ~in_front.all(axis=1))
+        
+        # few triangles cross a plane, they are cut one by one and split into a fan
+        clipped = []
+        clipped_sources = []
+        for index in crossing:
+            polygon = clip_polygon(triangles[index], plane_point[None, :], plane_normal[None, :])
+            for corner in range(1, len(polygon) - 1):
+                clipped.append((polygon[0], polygon[corner], polygon[corner + 1]))
+                clipped_sources.append(sources[index])
+        
+        if clipped:
+            triangles = np.concatenate((triangles[whole], np.array(clipped)))
+            sources = np.concatenate((sources[whole], clipped_sources))
+        else:
+            triangles = triangles[whole]
+            sources = sources[whole]
+    
+    return triangles, sources
+
+# render the index of the closest triangle of every pixel of the camera view with a z-buffer
+# the rows of the image are split into tiles that are rendered on a thread pool, the first row is the bottom row
 
-        vertices = [obj.matrix_world @ obj.data.vertices[vert_idx].co for vert_idx in face.vertices]
-        bm_verts = [bm.verts.new(vert) for vert in vertices]
+def rasterize_triangle_ids(triangles, projection, width, height):
+    
+    ids = np.full((height, width), -1, dtype=np.int64)
+    if not len(triangles):
+        return ids
+    
+    view = project_points(projection, triangles.reshape(-1, 3)).reshape(-1, 3, 3)
+    x = view[:, :, 0] * width
+    y = view[:, :, 1] * height
+    
+    # the inverse depth of a perspective camera and the depth of an orthographic camera change linearly across the image
+    closeness = -view[:, :, 2] if projection.orthographic else 1.0 / view[:, :, 2]
+    
+    area = (x[:, 1] - x[:, 0]) * (y[:, 2] - y[:, 0]) - (x[:, 2] - x[:, 0]) * (y[:, 1] - y[:, 0])
+    
+    # pixel centers are at half pixel positions
+    x_first = np.maximum(np.ceil(x.min(axis=1) - 0.5), 0).astype(np.int64)
+    x_last = np.minimum(np.floor(x.max(axis=1) - 0.5), width - 1).astype(np.int64)
+    y_first = np.maximum(np.ceil(y.min(axis=1) - 0.5), 0).astype(np.int64)
+    y_last = np.minimum(np.floor(y.max(axis=1) - 0.5), height - 1).astype(np.int64)
+    
+    # triangles seen edge-on or outside of the image cover no pixel
+    drawn = np.flatnonzero((np.abs(area) > 1e-12) & (x_first <= x_last) & (y_first <= y_last))
+    
+    depth = np.full((height, width), -np.inf)
+    
+    # triangles with a small bounding box are rasterized together in batches, the large ones one by one
+    small = (x_last - x_first < raster_small_triangle_size) & (y_last - y_first < raster_small_triangle_size)
+    offsets = np.arange(raster_small_triangle_size)
+    
+    def rasterize_small(batch, start, stop):
+        row_first = np.maximum(y_first[batch], start)
+        row_last = np.minimum(y_last[batch], stop - 1)
+        
+        # a small grid of pixels at the corner of the bounding box of every triangle
+        rows = row_first[:, None, None] + offsets[None, :, None]
+        cols = x_first[batch][:, None, None] + offsets[None, None, :]
+        rows, cols = np.broadcast_arrays(rows, cols)
+        px = cols + 0.5
+        py = rows + 0.5
+        
+        x0, x1, x2 = (x[batch, corner][:, None, None] for corner in range(3))
+        y0, y1, y2 = (y[batch, corner][:, None, None] for corner in range(3))
+        triangle_area = area[batch][:, None, None]
+        
+        w0 = ((x2 - x1) * (py - y1) - (y2 - y1) * (px - x1)) / triangle_area
+        w1 = ((x0 - x2) * (py - y2) - (y0 - y2) * (px - x2)) / triangle_area
+        w2 = 1.0 - w0 - w1
+        inside = (w0 >= 0) & (w1 >= 0) & (w2 >= 0)
+        inside &= (rows <= row_last[:, None, None]) & (cols <= x_last[batch][:, None, None])
+        
+        c0, c1, c2 = (closeness[batch, corner][:, None, None] for corner in range(3))
+        z = w0 * c0 + w1 * c1 + w2 * c2
+        
+        hit = np.nonzero(inside)
+        pixels = rows[hit] * width + cols[hit]
+        z = z[hit]
+        triangles = batch[hit[0]]
+        
+        # keep the closest triangle of every pixel, the first triangle wins a tie like in the loop
+        order = np.lexsort((-triangles, z, pixels))
+        pixels, z, triangles = pixels[order], z[order], triangles[order]
+        last = np.append(pixels[1:] != pixels[:-1], True)
+        pixels, z, triangles = pixels[last], z[last], triangles[last]
+        
+        flat_depth = depth.reshape(-1)
+        flat_ids = ids.reshape(-1)
+        closer = z > flat_depth[pixels]
+        flat_depth[pixels[closer]] = z[closer]
+        flat_ids[pixels[closer]] = triangles[closer]
+    
+    def rasterize_tile(start):
+        stop = min(start + raster_tile_rows, height)
+        in_tile = drawn[(y_first[drawn] < stop) & (y_last[drawn] >= start)]
+        
+        small_in_tile = in_tile[small[in_tile]]
+        for index in range(0, len(small_in_tile), raster_batch_triangles):
+            rasterize_small(small_in_tile[index:index + raster_batch_triangles], start, stop)
+        
+        for triangle in in_tile[~small[in_tile]].tolist():
+            row_first = max(y_first[triangle], start)
+            row_last = min(y_last[triangle], stop - 1)
+            px = np.arange(x_first[triangle], x_last[triangle] + 1) + 0.5
+            py = (np.arange(row_first, row_last + 1) + 0.5)[:, None]
+            
+            x0, x1, x2 = x[triangle]
+            y0, y1, y2 = y[triangle]
+            
+            # barycentric weights from the edge functions
+            w0 = ((x2 - x1) * (py - y1) - (y2 - y1) * (px - x1)) / area[triangle]
+            w1 = ((x0 - x2) * (py - y2) - (y0 - y2) * (px - x2)) / area[triangle]
+            w2 = 1.0 - w0 - w1
+            inside = (w0 >= 0) & (w1 >= 0) & (w2 >= 0)
+            
+            c0, c1, c2 = closeness[triangle]
+            z = w0 * c0 + w1 * c1 + w2 * c2
+            
+            tile_depth = depth[row_first:row_last + 1, x_first[triangle]:x_last[triangle] + 1]
+            tile_ids = ids[row_first:row_last + 1, x_first[triangle]:x_last[triangle] + 1]
+            closer = inside & (z > tile_depth)
+            tile_depth[closer] = z[closer]
+            tile_ids[closer] = triangle
+    
+    # every tile writes its own rows
+    with ThreadPoolExecutor(resample_threads) as executor:
+        list(executor.map(rasterize_tile, range(0, height, raster_tile_rows)))
+    
+    return ids
 
-        bm.faces.new(bm_verts)
-        bm.faces.ensure_lookup_table()
+# split the rendered pixels into the coplanar face clusters of the objects
+# returns a buffer with the surface index of every pixel and the object, faces and coverage of every surface
+
+def get_visible_surfaces(triangle_ids, triangle_objects, triangle_polygons, candidates, depsgraph, min_coverage):
+    
+    surface_ids = np.full(triangle_ids.shape, -1, dtype=np.int64)
+    covered = triangle_ids >= 0
+    if not np.any(covered):
+        return surface_ids, []
+    
+    pixel_triangles = triangle_ids[covered]
+    pixel_objects = triangle_objects[pixel_triangles]
+    pixel_polygons = triangle_polygons[pixel_triangles]
+    
+    # number the clusters of all objects one after the other
+    pixel_surfaces = np.empty(len(pixel_triangles), dtype=np.int64)
+    object_clusters = []
+    first_surface = 0
+    for object_index in np.unique(pixel_objects).tolist():
+        obj = candidates[object_index]
+        clusters = get_coplanar_face_clusters(obj.evaluated_get(depsgraph).data)
+        in_object = pixel_objects == object_index
+        pixel_surfaces[in_object] = clusters[pixel_polygons[in_object]] + first_surface
+        object_clusters.append((first_surface, obj, clusters))
+        first_surface += clusters.max() + 1
+    
+    counts = np.bincount(pixel_surfaces, minlength=first_surface)
+    coverage = counts / triangle_ids.size
+    
+    # small surfaces are left out and their pixels count as not covered, the largest surface comes first
+    kept = np.flatnonzero(coverage >= min_coverage)
+    kept = kept[np.argsort(-coverage[kept], kind="stable")]
+    remap = np.full(first_surface, -1, dtype=np.int64)
+    remap[kept] = np.arange(len(kept))
+    surface_ids[covered] = remap[pixel_surfaces]
+    
+    surfaces = []
+    starts = [first for first, obj, clusters in object_clusters]
+    for surface in kept.tolist():
+        first, obj, clusters = object_clusters[np.searchsorted(starts, surface, side="right") - 1]
+        surfaces.append((obj, np.flatnonzero(clusters == surface - first).tolist(), float(coverage[surface])))
+    
+    return surface_ids, surfaces
+
+# get the faces moved to the layer in front of them and clipped to the part seen by the camera
+
+def get_clipped_face_polygons(similar_faces, obj, distance, camera):
+    
+    scene = bpy.context.scene
+    plane_points, plane_normals = get_camera_frustum_planes(camera, scene)
+    
+    # the part of the face removed by a clipping plane of the issue is not seen in the snapshot
+    clipping_points, clipping_normals = get_issue_clipping_planes(camera)
+    plane_points = np.vstack((plane_points, clipping_points))
+    plane_normals = np.vstack((plane_normals, clipping_normals))
+    
+    vertices = get_world_vertices(obj)
+    normal_matrix = np.array(obj.matrix_world.to_3x3())
+    polygons = []
+    
+    for face_index in similar_faces:
+        face = obj.data.polygons[face_index]
 
         # normal direction
-        normal = face.normal.normalized()
-        normal_world = obj.matrix_world.to_3x3() @ normal
+        normal_world = normal_matrix @ np.array(face.normal)
+        normal_world /= np.linalg.norm(normal_world)
 
         # new position of face
-        for vert in bm_verts:
-            vert.co += normal_world * distance
-                          
+        polygon = vertices[list(face.vertices)] + normal_world * distance
+        
+        # keep the part of the face inside the camera view
+        polygon = clip_polygon(polygon, plane_points, plane_normals)
+        if len(polygon) >= 3:
+            polygons.append(polygon)
+    
+    return polygons
+
+# create a face that fits to the colored part of the image, the clipped polygons can be given if they were checked before
+
+def create_and_adjust_projection_face(similar_faces, obj, distance, image, planar_frame, camera, polygons=None):
+
+    ensure_object_mode()
+    deselect_all()
+    
+    if polygons is None:
+        polygons = get_clipped_face_polygons(similar_faces, obj, distance, camera)
+    
+    # nothing is created for a face outside of the camera view
+    if not polygons:
+        raise LookupError("The projection face is outside of the camera view.")
+    
+    # create a face
+    
+    mesh = bpy.data.meshes.new("NewMesh")
+    new_obj = bpy.data.objects.new("ProjectionFace", mesh)
+    mark_issue_layer(new_obj)
+    bpy.context.collection.objects.link(new_obj)
+
+    bm = bmesh.new()
+
+    for polygon in polygons:
+        bm_verts = [bm.verts.new(vert) for vert in polygon.tolist()]
+        bm.faces.new(bm_verts)
+    
+    # join the cut faces again
+    bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=1e-6)
     bm.to_mesh(mesh)
     bm.free()
     
-    # create UV map
+    if not mesh.polygons:
+        remove_objects([new_obj])
+        raise LookupError("The projection face is outside of the camera view.")
+    
+    # the image is resampled already, the cut faces are merged back to the fewest polygons
+    simplify_issue_layer(new_obj)
+    
+    # create UV map with the same planar frame as the resampled image
     bpy.context.view_layer.objects.active = new_obj
     bpy.context.view_layer.objects.active.select_set(True)
-    bpy.ops.object.mode_set(mode='OBJECT')
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action = 'SELECT')
-    bpy.ops.uv.smart_project(rotate_method='AXIS_ALIGNED_Y')
+    set_uv_from_planar_frame(new_obj, planar_frame, new_obj.data.uv_layers.new(name="UVMap"))
 
     # apply material
     if not new_obj.data.materials:
@@ -528,213 +2224,948 @@ def create_and_adjust_projection_face(similar_faces, obj, distance, image, sourc
     uv_node = nodes.new(type='ShaderNodeUVMap')
     uv_node.uv_map = new_obj.data.uv_layers.active.name
     bsdf_node.inputs['Alpha'].default_value = 1
-    texture_node.image = bpy.data.images.load(image)
+    texture_node.image = bpy.data.images.load(image, check_existing=True)
+    links.new(bsdf_node.outputs['BSDF'], output_node.inputs['Surface'])
+    links.new(texture_node.outputs['Color'], bsdf_node.inputs['Base Color'])
+    links.new(uv_node.outputs['UV'], texture_node.inputs['Vector'])
+    
+    deselect_all()
+    
+    return new_obj
+
+# make the annotation_obj transparent to prepare the editing with texture paint  
+    
+def prepare_annotation_layer(obj, folder_path, image_size=(1024, 1024), name_key=None):
+    # ensure the object is selected and active
+    bpy.context.view_layer.objects.active = obj
+    bpy.context.view_layer.objects.active.select_set(True)
+
+    # make sure the object is in object mode
+    ensure_object_mode()
+    
+    # create UV map, the planar frame of the projection keeps the annotation aligned with the image size
+    if planar_frame_property in obj:
+        set_uv_from_planar_frame(obj, get_planar_uv_frame_property(obj), obj.data.uv_layers.new(name="UVMap"))
+    else:
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.select_all(action = 'SELECT')
+        bpy.ops.uv.unwrap(method='ANGLE_BASED', margin=0)
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    # create a new material or use the current material
+    if not obj.data.materials:
+        mat = bpy.data.materials.new(name="NewFaceMaterial")
+        obj.data.materials.append(mat)
+    else:
+        mat = obj.data.materials[0]
+
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+
+    # clear existing nodes
+    for node in nodes:
+        nodes.remove(node)
+
+    # add nodes
+    output_node = nodes.new(type='ShaderNodeOutputMaterial')
+    bsdf_node = nodes.new(type='ShaderNodeBsdfPrincipled')
+    texture_node = nodes.new(type='ShaderNodeTexImage')
+    uv_node = nodes.new(type='ShaderNodeUVMap')
+    uv_node.uv_map = obj.data.uv_layers.active.name
+    
+    # create a new image as base for annotations
+    image_name = "New_Image"
+    width, height = image_size
+    color = (0, 0, 0, 0)
+    image = bpy.data.images.new(name=image_name, width=width, height=height, alpha=True, float_buffer=False)
+    image.generated_color = color
+    
+    # save the image to a file
+    
+    # name the image after the issue, the annotations of an earlier projection of the same issue are not overwritten
+    name_key = name_key or uuid.uuid4().hex
+    file_path = os.path.join(folder_path, f"issue_annotation_{name_key}.png")
+    index = 1
+    while os.path.exists(file_path):
+        index += 1
+        file_path = os.path.join(folder_path, f"issue_annotation_{name_key}_{index}.png")
+    image.filepath_raw = file_path
+    image.file_format = 'PNG'
+    image.save()
+    
+    texture_node.image = image
+    
+    # connect nodes
     links.new(bsdf_node.outputs['BSDF'], output_node.inputs['Surface'])
     links.new(texture_node.outputs['Color'], bsdf_node.inputs['Base Color'])
+    links.new(texture_node.outputs['Alpha'], bsdf_node.inputs['Alpha'])
     links.new(uv_node.outputs['UV'], texture_node.inputs['Vector'])
-    bpy.ops.object.mode_set(mode='OBJECT')  
+
+    ensure_object_mode()
+    
+# hash the world positions of the faces of a cluster, a changed model invalidates a stored projection
+
+def get_face_cluster_hash(obj, face_indices):
+    
+    vertices = get_world_vertices(obj)
+    digest = hashlib.sha1()
+    for face_index in face_indices:
+        digest.update(np.array(obj.data.polygons[face_index].vertices, dtype=np.int64).tobytes())
+        digest.update(vertices[list(obj.data.polygons[face_index].vertices)].round(6).tobytes())
+    return digest.hexdigest()
+
+# the values of a camera that change its projection
+
+def get_camera_state(camera, scene):
+    return np.concatenate((
+        np.array(camera.matrix_world, dtype=np.float64).ravel(),
+        (camera.data.angle, camera.data.ortho_scale, camera.data.type == 'ORTHO', scene.render.resolution_x, scene.render.resolution_y)
+    )).tolist()
+
+# store what the projection face was made of, so a later viewpoint of the issue can reuse it
+
+def set_issue_state(projection_face, annotation_obj, source, similar_faces, camera, absolute_snapshot_path, absolute_viewpoint_path, topic_guid=None):
+    
+    # the GUID of the markup, otherwise the folder of the snapshot in a BCF archive is named after the topic GUID
+    if topic_guid is None:
+        topic_guid = os.path.basename(os.path.dirname(absolute_snapshot_path))
+    
+    set_planar_uv_frame_property(projection_face, get_planar_uv_frame_property(annotation_obj))
+    projection_face[issue_state_property] = {
+        "source": source.name,
+        "faces": list(similar_faces),
+        "geometry": get_face_cluster_hash(source, similar_faces),
+        "camera": get_camera_state(camera, bpy.context.scene),
+        "clipping_planes": list(camera.get(clipping_planes_property, [])),
+        "snapshot": get_file_hash(absolute_snapshot_path),
+        "snapshot_path": absolute_snapshot_path,
+        "viewpoint_path": absolute_viewpoint_path,
+        "topic": topic_guid,
+        "annotation": annotation_obj.name
+    }
+    projection_face[issue_topic_property] = topic_guid
+    annotation_obj[issue_topic_property] = topic_guid
+    
+    set_issue_record(bpy.context.scene, projection_face, annotation_obj)
+
+# issue records of the scene, the index from topic GUID to record is rebuilt when the records change
+
+issue_record_index = {"scene": None, "count": -1, "index": {}}
+
+def get_issue_record(scene, topic_guid):
+    
+    for attempt in range(2):
+        if issue_record_index["scene"] != scene.name or issue_record_index["count"] != len(scene.bcf_issues):
+            issue_record_index["scene"] = scene.name
+            issue_record_index["count"] = len(scene.bcf_issues)
+            issue_record_index["index"] = {record.topic_guid: index for index, record in enumerate(scene.bcf_issues)}
+        
+        index = issue_record_index["index"].get(topic_guid)
+        if index is None:
+            return None
+        
+        record = scene.bcf_issues[index]
+        if record.topic_guid == topic_guid:
+            return record
+        
+        # the records were reordered or renamed
+        clear_issue_record_index()
+    
+    return None
+
+@persistent
+def clear_issue_record_index(*args):
+    issue_record_index["count"] = -1
+
+# add or update the record of the issue of a projection face, the objects are referenced directly and not by name
+
+def set_issue_record(scene, projection_face, annotation_obj=None, topic=None):
+    
+    state = projection_face[issue_state_property]
+    topic_guid = state["topic"]
+    
+    record = get_issue_record(scene, topic_guid)
+    if record is None:
+        record = scene.bcf_issues.add()
+        record.topic_guid = topic_guid
+        clear_issue_record_index()
+    
+    if topic is not None:
+        record.title = topic.title or ""
+        record.status = topic.status or ""
+    
+    record.source_object = state["source"]
+    record.projection_face = projection_face
+    record.annotation_layer = annotation_obj or bpy.data.objects.get(state["annotation"])
+    record.snapshot_path = state.get("snapshot_path", "")
+    record.viewpoint_path = state.get("viewpoint_path", "")
+    record.projection_image = get_material_image(projection_face).filepath
+    if record.annotation_layer is not None and record.annotation_layer.data.materials:
+        record.annotation_image = get_material_image(record.annotation_layer).filepath
+    record.processed = datetime.now().isoformat(timespec="seconds")
+    
+    write_issue_database(scene, record)
+    return record
+
+# remove the objects and the record of an issue
+
+def delete_issue_record(scene, topic_guid):
+    
+    record = get_issue_record(scene, topic_guid)
+    if record is None:
+        return False
+    
+    remove_objects([obj for obj in (record.projection_face, record.annotation_layer) if obj is not None])
+    scene.bcf_issues.remove(issue_record_index["index"][topic_guid])
+    clear_issue_record_index()
+    
+    if scene.bcf_issue_database:
+        try:
+            with closing(sqlite3.connect(bpy.path.abspath(scene.bcf_issue_database))) as database, database:
+                database.execute("DELETE FROM issues WHERE topic_guid = ?", (topic_guid,))
+        except sqlite3.Error as e:
+            print(f"Error: {e}")
+    
+    return True
+
+# mirror a record into the optional SQLite index next to the .blend file
+
+issue_database_columns = ("topic_guid", "title", "status", "source_object", "snapshot_path", "viewpoint_path", "projection_image", "annotation_image", "processed")
+
+def write_issue_database(scene, record):
+    
+    if not scene.bcf_issue_database:
+        return
+    
+    values = [getattr(record, column) for column in issue_database_columns]
+    values += [record.projection_face.name if record.projection_face else "", record.annotation_layer.name if record.annotation_layer else ""]
+    
+    try:
+        with closing(sqlite3.connect(bpy.path.abspath(scene.bcf_issue_database))) as database, database:
+            database.execute(f"CREATE TABLE IF NOT EXISTS issues ({' TEXT, '.join(issue_database_columns)} TEXT, projection_face TEXT, annotation_layer TEXT, PRIMARY KEY (topic_guid))")
+            database.execute(f"INSERT OR REPLACE INTO issues VALUES ({', '.join('?' * len(values))})", values)
+    except sqlite3.Error as e:
+        print(f"Error: {e}")
+
+# find the projection face of an issue from itself or from its annotation layer
+
+def find_issue_projection(obj):
+    
+    if obj is None:
+        return None
+    if issue_state_property in obj:
+        return obj
+    
+    record = get_issue_record(bpy.context.scene, obj.get(issue_topic_property))
+    return record.projection_face if record is not None else None
+
+# scale the painted annotation to a new image size, the planar uv frame is the same so the pixels stay in place
+
+def resize_annotation_image(annotation_obj, image_size):
+    
+    image = get_material_image(annotation_obj)
+    if tuple(image.size) == tuple(image_size):
+        return False
+    
+    image.scale(*image_size)
+    image.save()
+    return True
+
+# update an existing projection with a changed viewpoint or snapshot of the issue
+# the target object, face cluster and annotation layer are reused while they are still hit by the camera,
+# otherwise the whole projection is created again and the old annotation layer is kept
+
+def main_update_issue_projection(context, projection_face, absolute_snapshot_path=None, absolute_viewpoint_path=None):
+    
+    # use the issue of the scene settings if no paths are given
+    if absolute_snapshot_path is None:
+        absolute_snapshot_path, absolute_viewpoint_path = get_issue_paths(context)
+    
+    state = projection_face[issue_state_property].to_dict()
+    source = bpy.data.objects.get(state["source"])
+    record = get_issue_record(context.scene, state["topic"])
+    annotation_obj = record.annotation_layer if record is not None else bpy.data.objects.get(state["annotation"])
+    
+    with profile_issue(context, absolute_snapshot_path):
+        
+        camera, camera_name, absolute_snapshot_path = main_create_camera_with_BCF_data(context, absolute_snapshot_path, absolute_viewpoint_path)
+        
+        with profile_stage("change detection") as stage:
+            camera_changed = not np.allclose(get_camera_state(camera, context.scene), state["camera"], atol=1e-6)
+            clipping_planes = list(camera.get(clipping_planes_property, []))
+            if len(clipping_planes) != len(state.get("clipping_planes", [])) or not np.allclose(clipping_planes, state.get("clipping_planes", []), atol=1e-6):
+                camera_changed = True
+            snapshot_changed = get_file_hash(absolute_snapshot_path) != state["snapshot"]
+            
+            valid = (
+                source is not None and annotation_obj is not None
+                and max(state["faces"]) < len(source.data.polygons)
+                and get_face_cluster_hash(source, state["faces"]) == state["geometry"]
+            )
+            
+            # the camera has to see the same face cluster of the same object
+            if valid and camera_changed:
+                largest_object, largest_face = get_largest_visible_cluster(camera)
+                valid = largest_object == source and largest_face.index in state["faces"]
+            
+            stage["camera_changed"] = camera_changed
+            stage["snapshot_changed"] = snapshot_changed
+            stage["valid"] = valid
+        
+        if not valid:
+            remove_objects([camera])
+            print(f"The projection of '{state['source']}' is not valid for the new viewpoint, it is created again.")
+            new_projection_face, new_annotation_obj = main_set_camera_and_create_face(context, absolute_snapshot_path, absolute_viewpoint_path, state["topic"])
+            remove_objects([projection_face])
+            return new_projection_face, new_annotation_obj
+        
+        if not camera_changed and not snapshot_changed:
+            remove_objects([camera])
+            print("The viewpoint and snapshot of the issue are unchanged.")
+            return projection_face, annotation_obj
+        
+        snapshot_image = get_snapshot_image(absolute_snapshot_path)
+        image_size = get_planned_texture_resolution(projection_face, camera)
+        
+        with profile_stage("resample") as stage:
+            orthogonal_image, image_folder_path = bake_projection_image(snapshot_image, camera, get_planar_uv_frame_property(projection_face), image_size)
+            stage["image_size"] = list(image_size)
+        
+        if camera_changed:
+            # the part of the cluster inside the camera view changes
+            with profile_stage("frustum clipping") as stage:
+                name = projection_face.name
+                new_projection_face = create_and_adjust_projection_face(state["faces"], source, distance_between_layers, orthogonal_image, get_planar_uv_frame_property(projection_face), camera)
+                remove_objects([projection_face])
+                projection_face = new_projection_face
+                projection_face.name = name
+                stage["vertices"] = len(projection_face.data.vertices)
+        else:
+            texture_node = next(node for node in projection_face.data.materials[0].node_tree.nodes if node.type == 'TEX_IMAGE')
+            texture_node.image = bpy.data.images.load(orthogonal_image, check_existing=True)
+        
+        with profile_stage("annotation resize") as stage:
+            stage["resized"] = resize_annotation_image(annotation_obj, image_size)
+            stage["image_size"] = list(image_size)
+        
+        set_issue_state(projection_face, annotation_obj, source, state["faces"], camera, absolute_snapshot_path, absolute_viewpoint_path, state["topic"])
+        
+        with profile_stage("cleanup"):
+            remove_objects([camera])
+    
+    return projection_face, annotation_obj
+
+# create face from camera view
+# the pipeline is a generator of steps: every yield ends a slice of main thread work,
+# a yielded function does not touch bpy and may run in another thread, its result is sent back
+# steps that are spread over several modal calls get bpy.context instead of the context of the first call
+
+def issue_pipeline_steps(context, absolute_snapshot_path=None, absolute_viewpoint_path=None, issue_files=None, topic_guid=None):
+    
+    # use the issue of the scene settings if no paths are given
+    if absolute_snapshot_path is None:
+        absolute_snapshot_path, absolute_viewpoint_path = get_issue_paths(context)
+    
+    with profile_issue(context, absolute_snapshot_path):
+        
+        # read the viewpoint and the snapshot header if it was not done before
+        if issue_files is None:
+            with profile_stage("parse viewpoint"):
+                issue_files = yield lambda: read_issue_files(absolute_snapshot_path, absolute_viewpoint_path)
+        
+        # the objects of the issue are removed again if a step fails or the steps are closed before the end
+        created = []
+        finished = False
+        
+        try:
+            # create camera
+            camera, camera_name, absolute_snapshot_path = main_create_camera_with_BCF_data(context, absolute_snapshot_path, absolute_viewpoint_path, issue_files)
+            created.append(camera)
+            yield None
+
+            # cast rays across the camera frame, the objects hit by them are the candidates of the target
+            with profile_stage("object search") as stage:
+                histogram = get_visible_face_histogram(camera)
+                stage["objects"] = len(scene_bounds_cache["names"])
+                stage["object_bvhs"] = len(object_bvh_cache)
+            if not histogram:
+                raise LookupError("No object found in the direction of the camera.")
+            yield None
+            
+            # get the face cluster that covers the greatest part of the snapshot
+            with profile_stage("face search") as stage:
+                first_object, largest_face = get_largest_visible_cluster(camera, histogram)
+                stage["objects"] = len({object_name for object_name, polygon_index in histogram})
+            if not largest_face:
+                raise LookupError("No visible faces found.")
+            print(f"The found object is '{first_object.name}'.")
+            
+            # get similar faces with the same normal vectors
+            with profile_stage("face clustering") as stage:
+                similar_faces = get_face_with_similar_normal(first_object,largest_face)
+                stage["faces"] = len(similar_faces)
+            if not similar_faces:
+                raise LookupError("No similar faces found.")
+            yield None
+            
+            # the snapshot is resampled into the planar uv frame of the projection face in front of the faces
+            planar_frame = get_layer_uv_frame(first_object, similar_faces, distance_between_layers)
+            
+            # create the annotation layer at a distance in the direction of the face normal
+            with profile_stage("mesh build") as stage:
+                annotation_obj = create_annotation_layer(similar_faces, first_object, distance_between_layers)
+                created.append(annotation_obj)
+                stage["vertices"] = len(annotation_obj.data.vertices)
+            print(f"New face created for object '{first_object.name}' based on the visible face.")
+            
+            # the annotation layer shares the planar uv frame and image size of the projection
+            set_planar_uv_frame_property(annotation_obj, planar_frame)
+            image_size = get_planned_texture_resolution(annotation_obj, camera)
+            
+            with profile_stage("resample") as stage:
+                orthogonal_image, image_folder_path = yield from bake_projection_image_steps(get_snapshot_image(absolute_snapshot_path), camera, planar_frame, image_size)
+                stage["image_size"] = list(image_size)
+            
+            with profile_stage("frustum clipping") as stage:
+                projection_face = create_and_adjust_projection_face(similar_faces, first_object, distance_between_layers, orthogonal_image, planar_frame, camera)
+                created.append(projection_face)
+                stage["vertices"] = len(projection_face.data.vertices)
+            deselect_all()
+            yield None
+            
+            simplify_issue_layer(annotation_obj)
+            
+            with profile_stage("annotation setup") as stage:
+                prepare_annotation_layer(annotation_obj, image_folder_path, image_size, topic_guid or os.path.basename(os.path.dirname(absolute_snapshot_path)))
+                stage["image_size"] = list(image_size)
+                stage["vertices"] = len(annotation_obj.data.vertices)
+            deselect_all()
+            
+            # remember the parts of the projection for later updates of the issue
+            set_issue_state(projection_face, annotation_obj, first_object, similar_faces, camera, absolute_snapshot_path, absolute_viewpoint_path, topic_guid)
+            
+            finished = True
+        finally:
+            if not finished:
+                remove_objects(created)
+        
+        # delet anything that will not be used
+        with profile_stage("cleanup"):
+            remove_objects([camera])
+    
+    return projection_face, annotation_obj
+
+# run the steps of a generator on the main thread, errors of a step are raised inside the generator
+
+def run_issue_steps(steps):
+    
+    send = steps.send
+    value = None
+    
+    while True:
+        try:
+            work = send(value)
+        except StopIteration as stop:
+            return stop.value
+        
+        try:
+            value = work() if work is not None else None
+            send = steps.send
+        except Exception as e:
+            value = e
+            send = steps.throw
+
+def main_set_camera_and_create_face(context, absolute_snapshot_path=None, absolute_viewpoint_path=None, topic_guid=None):
+    return run_issue_steps(issue_pipeline_steps(context, absolute_snapshot_path, absolute_viewpoint_path, topic_guid=topic_guid))
+    
+# project the snapshot onto every surface that is visible in it in one pass
+# the rendered surface of every pixel decides which patch gets the pixel, so occluded parts stay transparent
+
+def main_project_visible_surfaces(context, absolute_snapshot_path=None, absolute_viewpoint_path=None):
+    
+    # use the issue of the scene settings if no paths are given
+    if absolute_snapshot_path is None:
+        absolute_snapshot_path, absolute_viewpoint_path = get_issue_paths(context)
+    
+    scene = context.scene
+    patches = []
+    
+    with profile_issue(context, absolute_snapshot_path):
+        
+        # the camera and the patches created so far are removed if the projection fails
+        created = []
+        finished = False
+        
+        try:
+            camera, camera_name, absolute_snapshot_path = main_create_camera_with_BCF_data(context, absolute_snapshot_path, absolute_viewpoint_path)
+            created.append(camera)
+            depsgraph = context.evaluated_depsgraph_get()
+            projection = get_camera_projection(camera, scene)
+            width = scene.render.resolution_x
+            height = scene.render.resolution_y
+            
+            # render the surface of every pixel of the snapshot
+            with profile_stage("rasterize") as stage:
+                candidates, mins, maxs = get_frustum_candidates(camera, scene, depsgraph)
+                triangles, triangle_objects, triangle_polygons = get_view_triangles(candidates, depsgraph)
+                # the near plane and the clipping planes of the issue, the side planes are left to the image bounds
+                plane_points, plane_normals = get_camera_culling_planes(camera, scene)
+                triangles, sources = clip_triangles(triangles, np.delete(plane_points, [0, 1, 2, 3, 5], axis=0), np.delete(plane_normals, [0, 1, 2, 3, 5], axis=0))
+                triangle_ids = rasterize_triangle_ids(triangles, projection, width, height)
+                stage["objects"] = len(candidates)
+                stage["triangles"] = len(triangles)
+                stage["image_size"] = [width, height]
+            
+            with profile_stage("visible surfaces") as stage:
+                surface_ids, surfaces = get_visible_surfaces(triangle_ids, triangle_objects[sources], triangle_polygons[sources], candidates, depsgraph, patch_min_coverage)
+                stage["surfaces"] = len(surfaces)
+            if not surfaces:
+                raise LookupError("No surfaces found in the view of the camera.")
+            
+            snapshot_image = get_snapshot_image(absolute_snapshot_path)
+            settings = scene.texture_resolution
+            topic_guid = os.path.basename(os.path.dirname(absolute_snapshot_path))
+            
+            with profile_stage("patches") as stage:
+                for surface, (obj, faces, coverage) in enumerate(surfaces):
+                    
+                    # planar uv frame of the surface, moved onto the patch in front of it
+                    planar_frame = get_layer_uv_frame(obj, faces, distance_between_layers)
+                    
+                    # surfaces outside of the camera view get neither an image nor a patch
+                    polygons = get_clipped_face_polygons(faces, obj, distance_between_layers, camera)
+                    if not polygons:
+                        continue
+                    
+                    image_size = plan_texture_resolution(projection, planar_frame, (width, height), settings.max_size, settings.power_of_two)
+                    image_path, image_folder_path = bake_projection_image(snapshot_image, camera, planar_frame, image_size, surface_ids == surface)
+                    
+                    try:
+                        patch = create_and_adjust_projection_face(faces, obj, distance_between_layers, image_path, planar_frame, camera, polygons)
+                    except LookupError:
+                        continue
+                    created.append(patch)
+                    
+                    # occluded parts of the patch are transparent
+                    material = patch.data.materials[0]
+                    nodes = material.node_tree.nodes
+                    texture_node = next(node for node in nodes if node.type == 'TEX_IMAGE')
+                    bsdf_node = next(node for node in nodes if node.type == 'BSDF_PRINCIPLED')
+                    material.node_tree.links.new(texture_node.outputs['Alpha'], bsdf_node.inputs['Alpha'])
+                    material.blend_method = 'HASHED'
+                    
+                    patch.name = "ProjectionPatch"
+                    set_planar_uv_frame_property(patch, planar_frame)
+                    patch[issue_topic_property] = topic_guid
+                    patches.append(patch)
+                    print(f"Projection patch on '{obj.name}' covers {coverage * 100:.1f} % of the snapshot.")
+                
+                stage["patches"] = len(patches)
+            
+            finished = True
+        finally:
+            if not finished:
+                remove_objects(created)
+        
+        with profile_stage("cleanup"):
+            remove_objects([camera])
+    
+    return patches
+
+# create the camera of a stored issue again and select its projection face
+
+def main_reopen_issue(context, topic_guid):
     
-    num_vertices_before_cut = len(new_obj.data.vertices)
+    record = get_issue_record(context.scene, topic_guid)
+    if record is None:
+        raise LookupError(f"No stored issue '{topic_guid}'.")
     
-    scene = bpy.context.scene
-    cam = camera.data
-    frame = cam.view_frame(scene=scene)
-    mat = camera.matrix_world.normalized()
-    verts = [mat @ v for v in frame]
+    camera, camera_name, absolute_snapshot_path = main_create_camera_with_BCF_data(context, record.snapshot_path, record.viewpoint_path)
     
-    # create mesh to fit the view of the camera
-    mesh = bpy.data.meshes.new(name="CameraViewMesh")
-    mesh.from_pydata(verts, [], [(0, 1, 2, 3)])
-    mesh.update()
+    deselect_all()
+    for obj in (record.projection_face, record.annotation_layer):
+        if obj is not None:
+            obj.select_set(True)
+    if record.projection_face is not None:
+        context.view_layer.objects.active = record.projection_face
     
-    cut_obj = bpy.data.objects.new("CameraViewMesh", mesh)
-    bpy.context.collection.objects.link(cut_obj)
+    return camera
+
+# just creating the camera    
+
+def main_create_camera(context):
     
-    bpy.context.view_layer.objects.active = cut_obj
-    bpy.ops.object.mode_set(mode='OBJECT')
-    bpy.ops.object.select_all(action='DESELECT')
+    camera, camera_name, absolute_snapshot_path = main_create_camera_with_BCF_data(context)
+    bpy.context.scene.camera = camera
     
-    # turn mesh into curve
-    cut_obj.select_set(True)
-    bpy.ops.object.convert(target='CURVE')
-    bpy.ops.object.select_all(action='DESELECT')
+    set_view_to_camera()
     
-    bpy.context.scene.camera = camera
+# process every topic of a BCF archive or folder, or only the topics with the given GUIDs
+# with update the existing projections of the topics are updated instead of created again
+
+def main_batch_process_issues(context, archive_path, topic_guids=None, update=False):
     
-    for area in bpy.context.screen.areas:
-        if area.type == 'VIEW_3D':
-            for space in area.spaces:
-                if space.type == 'VIEW_3D':
-                    space.region_3d.view_perspective = 'CAMERA'
-                    
-    for area in bpy.context.screen.areas:
-        if area.type == 'VIEW_3D':
-            for region in area.regions:
-                if region.type == 'WINDOW':
-                    with bpy.context.temp_override(area=area, region=region):
-                        # set the new object as active and switch to edit mode
-                        bpy.context.view_layer.objects.active = new_obj
-                        bpy.ops.object.mode_set(mode='EDIT')
-                        bpy.ops.mesh.select_all(action='SELECT')
-                        
-                        # switch to object mode, select the cut object, and switch back to edit mode
-                        bpy.ops.object.mode_set(mode='OBJECT')
-                        cut_obj.select_set(True)
-                        bpy.context.view_layer.objects.active = new_obj
-                        bpy.ops.object.mode_set(mode='EDIT')
-                        
-                        # do knife project from the camera view
-                        bpy.ops.mesh.knife_project(cut_through=True)
-                        
-                        bpy.ops.object.mode_set(mode='OBJECT')
-                        cut_obj.select_set(False)
-                        bpy.ops.object.select_all(action='DESELECT')
-                        
-    num_vertices_after_cut = len(new_obj.data.vertices)
-    if num_vertices_before_cut < num_vertices_after_cut:
-        # separate the visual part of the issue from the rest
-        bpy.context.view_layer.objects.active = new_obj
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.separate(type='SELECTED')
-        bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.ops.object.select_all(action='DESELECT')
-                
-        bpy.context.view_layer.objects.active = new_obj
-        bpy.context.view_layer.objects.active.select_set(True)
-        bpy.ops.object.delete()
-        bpy.ops.object.select_all(action='DESELECT')
+    results = []
+    
+    for topic in iter_bcf_topics(archive_path):
+        if topic_guids is not None and topic.guid not in topic_guids:
+            continue
+        
+        start = time.perf_counter()
+        result = {"guid": topic.guid, "title": topic.title, "success": False, "error": None, "objects": []}
+        existing = set(bpy.data.objects)
+        
+        try:
+            snapshot_path, viewpoint_path = get_bcf_viewpoint_paths(archive_path, topic)
+            record = get_issue_record(context.scene, topic.guid) if update else None
+            if record is not None and record.projection_face is not None:
+                projection_face, annotation_obj = main_update_issue_projection(context, record.projection_face, snapshot_path, viewpoint_path)
+            else:
+                projection_face, annotation_obj = main_set_camera_and_create_face(context, snapshot_path, viewpoint_path, topic.guid)
+            set_issue_record(context.scene, projection_face, annotation_obj, topic)
+            result["objects"] = [projection_face.name, annotation_obj.name]
+            result["success"] = True
+        except Exception as e:
+            result["error"] = str(e)
+            # a topic without viewpoint or target fails again in the next attempt
+            result["retry"] = not isinstance(e, LookupError)
+            traceback.print_exc()
+            # leave edit mode so the next issue starts from a clean state
+            ensure_object_mode()
+            # remove the camera and the partial layers of the failed issue
+            remove_objects([obj for obj in bpy.data.objects if obj not in existing])
+        
+        result["seconds"] = time.perf_counter() - start
+        if last_issue_profile is not None:
+            result["stages"] = last_issue_profile["stages"]
+        results.append(result)
+        
+        if result["success"]:
+            print(f"Issue '{topic.guid}' processed in {result['seconds']:.2f} s.")
+        else:
+            print(f"Issue '{topic.guid}' failed after {result['seconds']:.2f} s: {result['error']}")
+    
+    # the scene is left as it was before the batch
+    restore_bcf_components(context.view_layer)
+    
+    failed = sum(1 for result in results if not result["success"])
+    print(f"{len(results) - failed} of {len(results)} issues processed, {failed} failed.")
     
-    return cut_obj
+    return results
 
-# make the annotation_obj transparent to prepare the editing with texture paint  
+# append the objects of processed issues from a worker .blend file into the current scene
+
+def append_issue_objects(blend_path, object_names):
     
-def prepare_annotation_layer(obj, folder_path):
-    # ensure the object is selected and active
-    bpy.context.view_layer.objects.active = obj
-    bpy.context.view_layer.objects.active.select_set(True)
+    object_names = set(object_names)
+    with bpy.data.libraries.load(blend_path, link=False) as (data_from, data_to):
+        names = [name for name in data_from.objects if name in object_names]
+        data_to.objects = list(names)
+    
+    # appended objects are renamed if the name is already used
+    appended = {}
+    for name, obj in zip(names, data_to.objects):
+        if obj is not None:
+            bpy.context.scene.collection.objects.link(obj)
+            appended[name] = obj.name
+    
+    return appended
 
-    # make sure the object is in object mode
-    bpy.ops.object.mode_set(mode='OBJECT')
+# split the topics of a BCF archive into shards and process them in parallel blender processes
+# the current scene is saved once and loaded by every worker, failed topics are retried in another round
+# unless they failed for good, like a topic without viewpoint or without an object in view
 
-    # change to edit mode
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action = 'SELECT')
+def main_issue_farm(archive_path, workers, images_folder=None, retries=1, topic_guids=None):
+    
+    # the workers load a copy of the scene in another folder, so the folder relative to the .blend file is resolved here
+    images_folder = bpy.path.abspath(images_folder) if images_folder else get_image_folder_path()
+    
+    work_folder = tempfile.mkdtemp(prefix="bcf_issue_farm_")
+    blend_path = os.path.join(work_folder, "model.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+    
+    # the threads of the machine are shared by the workers
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    
+    pending = [topic.guid for topic in iter_bcf_topics(archive_path) if topic_guids is None or topic.guid in topic_guids]
+    results = {}
+    start = time.perf_counter()
+    
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+        
+        print(f"Round {attempt + 1}: {len(pending)} issues on {min(workers, len(pending))} workers.")
+        shards = [pending[index::workers] for index in range(workers) if pending[index::workers]]
+        processes = []
+        
+        for index, shard in enumerate(shards):
+            shard_path = os.path.join(work_folder, f"round{attempt}_shard{index}")
+            with open(shard_path + "_topics.json", 'w') as topics_file:
+                json.dump(shard, topics_file)
+            
+            command = [
+                bpy.app.binary_path, "--background", blend_path,
+                "--python", os.path.abspath(__file__), "--",
+                "--bcf", archive_path,
+                "--topics-file", shard_path + "_topics.json",
+                "--output", shard_path + ".blend",
+                "--report", shard_path + "_report.json",
+                "--threads", str(threads),
+                "--images", images_folder,
+                "--keep-cache"
+            ]
+            
+            log = open(shard_path + ".log", 'w')
+            processes.append((subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT), log, shard, shard_path))
+        
+        # gather the results and objects of every worker
+        for process, log, shard, shard_path in processes:
+            return_code = process.wait()
+            log.close()
+            
+            shard_results = []
+            if os.path.isfile(shard_path + "_report.json"):
+                with open(shard_path + "_report.json") as report:
+                    shard_results = json.load(report)
+            
+            # the objects of all issues of a shard are appended with one load of its .blend file
+            succeeded = [result for result in shard_results if result["success"]]
+            appended = {}
+            if succeeded:
+                appended = append_issue_objects(shard_path + ".blend", [name for result in succeeded for name in result["objects"]])
+            
+            reported = set()
+            for result in shard_results:
+                reported.add(result["guid"])
+                result["attempt"] = attempt + 1
+                if result["success"]:
+                    result["objects"] = [appended.get(name, name) for name in result["objects"]]
+                    projection_face, annotation_obj = [bpy.data.objects.get(name) for name in result["objects"]]
+                    if projection_face is not None:
+                        set_issue_record(bpy.context.scene, projection_face, annotation_obj)
+                results[result["guid"]] = result
+            
+            # topics of a crashed worker
+            for guid in shard:
+                if guid not in reported:
+                    results[guid] = {"guid": guid, "success": False, "error": f"Worker exited with code {return_code}, see {shard_path}.log", "objects": [], "attempt": attempt + 1}
+        
+        pending = [guid for guid in pending if not results[guid]["success"] and results[guid].get("retry", True)]
+    
+    # the workers do not evict the shared projection images, the records of all workers are known now
+    if projection_cache_eviction and os.path.isdir(images_folder):
+        evict_projection_images(images_folder, bpy.context.scene.bcf_cache_size_limit * 1024 * 1024)
     
-    # create UV map
-    bpy.ops.uv.unwrap(method='ANGLE_BASED', margin=0)
+    failed = sum(1 for result in results.values() if not result["success"])
+    summary = {
+        "archive": archive_path,
+        "workers": workers,
+        "seconds": time.perf_counter() - start,
+        "processed": len(results) - failed,
+        "failed": failed,
+        "work_folder": work_folder,
+        "issues": list(results.values())
+    }
+    print(f"{summary['processed']} of {len(results)} issues processed on {workers} workers in {summary['seconds']:.1f} s, {failed} failed.")
+    
+    return summary
 
+# run the batch processing from the command line
+# blender --background model.blend --python BCF_Issue_View.py -- --bcf issues.bcfzip
+# with --workers the topics are processed by several blender processes
 
-    # create a new material or use the current material
-    if not obj.data.materials:
-        mat = bpy.data.materials.new(name="NewFaceMaterial")
-        obj.data.materials.append(mat)
+def main_command_line(argv):
+    
+    global resample_threads, projection_cache_eviction
+    
+    parser = argparse.ArgumentParser(prog="BCF_Issue_View.py")
+    parser.add_argument("--bcf", required=True, help="BCF archive or extracted BCF folder")
+    parser.add_argument("--images", help="folder for the created images")
+    parser.add_argument("--output", help="save the processed scene to this .blend file")
+    parser.add_argument("--report", help="write the per-issue results to this JSON file")
+    parser.add_argument("--topics-file", help="JSON list of the topic GUIDs to process")
+    parser.add_argument("--workers", type=int, default=1, help="number of blender processes")
+    parser.add_argument("--retries", type=int, default=1, help="how often failed topics are retried by the workers")
+    parser.add_argument("--threads", type=int, help="threads for resampling the images")
+    parser.add_argument("--update", action="store_true", help="update the projections of the topics in the scene instead of creating them again")
+    parser.add_argument("--keep-cache", action="store_true", help="do not remove cached projection images, used by the workers of the issue farm")
+    args = parser.parse_args(argv)
+    
+    # the workers append new objects, the projections of the scene can not be updated by them
+    if args.workers > 1 and args.update:
+        parser.error("--update can not be combined with --workers")
+    
+    if args.images:
+        bpy.context.scene.bcf_image_folder = os.path.abspath(args.images)
+    if args.threads:
+        resample_threads = args.threads
+    if args.keep_cache:
+        projection_cache_eviction = False
+    
+    archive_path = os.path.abspath(args.bcf)
+    
+    topic_guids = None
+    if args.topics_file:
+        with open(args.topics_file) as topics_file:
+            topic_guids = set(json.load(topics_file))
+    
+    if args.workers > 1:
+        results = main_issue_farm(archive_path, args.workers, bpy.context.scene.bcf_image_folder, args.retries, topic_guids)
     else:
-        mat = obj.data.materials[0]
+        results = main_batch_process_issues(bpy.context, archive_path, topic_guids, args.update)
+    
+    if args.report:
+        with open(args.report, 'w') as report:
+            json.dump(results, report, indent=2)
+    
+    if args.output:
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(args.output))
+    
+    return results
 
-    mat.use_nodes = True
-    nodes = mat.node_tree.nodes
-    links = mat.node_tree.links
+# the topics of the issue browser are added in batches by a timer, so large archives do not block the interface
 
-    # clear existing nodes
-    for node in nodes:
-        nodes.remove(node)
+topic_loader = None
 
-    # add nodes
-    output_node = nodes.new(type='ShaderNodeOutputMaterial')
-    bsdf_node = nodes.new(type='ShaderNodeBsdfPrincipled')
-    texture_node = nodes.new(type='ShaderNodeTexImage')
-    uv_node = nodes.new(type='ShaderNodeUVMap')
-    uv_node.uv_map = obj.data.uv_layers.active.name
+def start_loading_topics(scene, archive_path):
     
-    # create a new image as base for annotations
-    image_name = "New_Image"
-    width = 1024
-    height = 1024
-    color = (0, 0, 0, 0)
-    image = bpy.data.images.new(name=image_name, width=width, height=height, alpha=True, float_buffer=False)
-    image.generated_color = color
+    global topic_loader
     
-    # save the image to a file
+    scene.bcf_topics.clear()
+    clear_topic_thumbnails()
+    scene.bcf_topics_archive = archive_path
+    topic_loader = (scene.name, iter_bcf_topics(archive_path))
     
-    # create a unique name with time
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if not bpy.app.timers.is_registered(load_topic_batch):
+        bpy.app.timers.register(load_topic_batch)
 
-    file_name = f"issue_annotation_{timestamp}.png"
-    file_path = os.path.join(folder_path, file_name)
-    image.filepath_raw = file_path
-    image.file_format = 'PNG'
-    image.save()
+def load_topic_batch():
     
-    texture_node.image = image
+    global topic_loader
     
-    # connect nodes
-    links.new(bsdf_node.outputs['BSDF'], output_node.inputs['Surface'])
-    links.new(texture_node.outputs['Color'], bsdf_node.inputs['Base Color'])
-    links.new(texture_node.outputs['Alpha'], bsdf_node.inputs['Alpha'])
-    links.new(uv_node.outputs['UV'], texture_node.inputs['Vector'])
-
-    bpy.ops.object.mode_set(mode='OBJECT')
+    if topic_loader is None or topic_loader[0] not in bpy.data.scenes:
+        topic_loader = None
+        return None
     
-# create face from camera view
+    scene = bpy.data.scenes[topic_loader[0]]
+    archive_path = scene.bcf_topics_archive
+    
+    for topic in topic_loader[1]:
+        item = scene.bcf_topics.add()
+        item.guid = topic.guid
+        item.title = topic.title or topic.guid
+        item.status = topic.status or ""
+        item.assigned_to = topic.assigned_to or ""
+        item.labels = ", ".join(topic.labels)
+        item.creation_date = topic.creation_date or ""
+        if topic.viewpoints and topic.viewpoints[0].snapshot:
+            item.snapshot_path = os.path.join(archive_path, *topic.viewpoints[0].snapshot.split("/"))
+        
+        if len(scene.bcf_topics) % topic_load_batch_size == 0:
+            tag_properties_redraw()
+            return 0.0
+    
+    topic_loader = None
+    tag_properties_redraw()
+    return None
+
+def tag_properties_redraw():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'PROPERTIES':
+                area.tag_redraw()
+
+# thumbnails of the snapshots are only made for rows that are drawn
+# a background thread copies the snapshots out of the archive, blender scales them down for the preview icons
 
-def main_set_camera_and_create_face(context):
+topic_previews = None
+thumbnail_executor = ThreadPoolExecutor(max_workers=1)
+thumbnail_requests = {}
+
+def get_thumbnail_folder():
+    return os.path.join(tempfile.gettempdir(), "BCFIssueViewThumbnails")
+
+# the previews are keyed by topic GUID, so they are dropped with the copied snapshots when topics are loaded again
+
+def clear_topic_thumbnails():
     
-    # create camera
-    camera, camera_name, absolute_snapshot_path = main_create_camera_with_BCF_data(context)
+    if topic_previews is not None:
+        topic_previews.clear()
+    thumbnail_requests.clear()
+    shutil.rmtree(get_thumbnail_folder(), ignore_errors=True)
 
-    # find the first object in the view of the camera
-    first_object = get_first_object_in_view(camera)
-    if first_object:
-        print(f"The found object is '{first_object.name}'.")
-        # get the largest visible face of the object
-        largest_face = get_largest_visible_face(camera, first_object)
+def extract_thumbnail_source(snapshot_path):
+    
+    archive_path = snapshot_path if os.path.isfile(snapshot_path) else split_bcf_archive_path(snapshot_path)[0]
+    stat = os.stat(archive_path)
+    key = hashlib.sha1(f"{snapshot_path}|{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest()
+    file_path = os.path.join(get_thumbnail_folder(), key + os.path.splitext(snapshot_path)[1].lower())
+    
+    if not os.path.isfile(file_path):
+        os.makedirs(get_thumbnail_folder(), exist_ok=True)
+        with open_bcf_path(snapshot_path) as stream, open(file_path + ".part", 'wb') as thumbnail:
+            thumbnail.write(stream.read())
+        os.replace(file_path + ".part", file_path)
+    
+    return file_path
 
-        if largest_face:
-            # get similar faces with the same normal vectors
-            similar_faces = get_face_with_similar_normal(first_object,largest_face)
-            
-            if similar_faces:
-                # create a new face at a distance in the direction of the face normal
-                new_object, annotation_obj = create_mesh_from_faces(similar_faces, first_object, distance_between_layers, number_cuts)
-                uv_perspective_from_view(new_object)
-                print(f"New face created for object '{first_object.name}' based on the visible face.")
-            else:
-                print("No similar faces found.")
-        else:
-            print("No visible faces found.")
-    else:
-        print("No object found in the direction of the camera.")
+def get_topic_thumbnail(item):
     
-    adding_issue_material(new_object, absolute_snapshot_path)
-    orthogonal_image, image_folder_path = get_image_from_orthogonal_view(new_object)
-    cut_rectangle = create_and_adjust_projection_face(similar_faces, first_object, distance_between_layers, orthogonal_image, new_object, camera)
-    bpy.ops.object.select_all(action='DESELECT')
-    prepare_annotation_layer(annotation_obj, image_folder_path)
-    bpy.ops.object.select_all(action='DESELECT')
+    if topic_previews is None or not item.snapshot_path:
+        return 0
+    if item.guid in topic_previews:
+        return topic_previews[item.guid].icon_id
     
-    # delet anything that will not be used
-    bpy.context.view_layer.objects.active = camera
-    bpy.context.view_layer.objects.active.select_set(True)
-    bpy.context.view_layer.objects.active = new_object
-    bpy.context.view_layer.objects.active.select_set(True)
-    bpy.context.view_layer.objects.active = cut_rectangle
-    bpy.context.view_layer.objects.active.select_set(True)
-    bpy.ops.object.delete()
-    bpy.ops.object.select_all(action='DESELECT')
+    if item.guid not in thumbnail_requests:
+        thumbnail_requests[item.guid] = thumbnail_executor.submit(extract_thumbnail_source, item.snapshot_path)
+        if not bpy.app.timers.is_registered(load_finished_thumbnails):
+            bpy.app.timers.register(load_finished_thumbnails, first_interval=0.1)
     
-# just creating the camera    
+    return 0
 
-def main_create_camera(context):
+def load_finished_thumbnails():
     
-    camera, camera_name, absolute_snapshot_path = main_create_camera_with_BCF_data(context)
-    bpy.context.scene.camera = camera
+    if topic_previews is None:
+        return None
     
-    for area in bpy.context.screen.areas:
-        if area.type == 'VIEW_3D':
-            for space in area.spaces:
-                if space.type == 'VIEW_3D':
-                    space.region_3d.view_perspective = 'CAMERA'
+    finished = [guid for guid, future in thumbnail_requests.items() if future.done()]
+    for guid in finished:
+        future = thumbnail_requests.pop(guid)
+        if future.exception() is None:
+            topic_previews.load(guid, future.result(), 'IMAGE')
+        else:
+            print(f"No thumbnail for topic '{guid}': {future.exception()}")
+    
+    if finished:
+        tag_properties_redraw()
     
+    return 0.2 if thumbnail_requests else None
+
+class BCFTopicItem(bpy.types.PropertyGroup):
+    guid: bpy.props.StringProperty(name="GUID")
+    title: bpy.props.StringProperty(name="Title")
+    status: bpy.props.StringProperty(name="Status")
+    assigned_to: bpy.props.StringProperty(name="Assigned To")
+    labels: bpy.props.StringProperty(name="Labels")
+    creation_date: bpy.props.StringProperty(name="Creation Date")
+    snapshot_path: bpy.props.StringProperty(name="Snapshot", subtype="FILE_PATH")
+    selected: bpy.props.BoolProperty(name="Selected", description="Project this topic with Project Selected Topics")
+
+class BCFIssueRecord(bpy.types.PropertyGroup):
+    topic_guid: bpy.props.StringProperty(name="Topic GUID")
+    title: bpy.props.StringProperty(name="Title")
+    status: bpy.props.StringProperty(name="Status")
+    source_object: bpy.props.StringProperty(name="Target Object")
+    projection_face: bpy.props.PointerProperty(name="Projection Face", type=bpy.types.Object)
+    annotation_layer: bpy.props.PointerProperty(name="Annotation Layer", type=bpy.types.Object)
+    snapshot_path: bpy.props.StringProperty(name="Snapshot", subtype="FILE_PATH")
+    viewpoint_path: bpy.props.StringProperty(name="Viewpoint", subtype="FILE_PATH")
+    projection_image: bpy.props.StringProperty(name="Projection Image", subtype="FILE_PATH")
+    annotation_image: bpy.props.StringProperty(name="Annotation Image", subtype="FILE_PATH")
+    processed: bpy.props.StringProperty(name="Processed")
+
 class SetFocalLength(bpy.types.PropertyGroup):
         value: bpy.props.FloatProperty(
         name="Set Focal Length",
@@ -753,6 +3184,22 @@ class SetSensorWidth(bpy.types.PropertyGroup):
         max=1000.00
     )
     
+class TextureResolution(bpy.types.PropertyGroup):
+    max_size: bpy.props.IntProperty(
+        name="Max Texture Size",
+        description="Largest width or height of the projection and annotation images in pixels",
+        default=4096,
+        min=16,
+        max=16384
+    )
+    power_of_two: bpy.props.BoolProperty(
+        name="Power of Two",
+        description="Round the image sizes up to powers of two",
+        default=True
+    )
+    last_width: bpy.props.IntProperty(name="Last Width")
+    last_height: bpy.props.IntProperty(name="Last Height")
+    
 class CreateIssueCamera(bpy.types.Operator):
     """Tooltip"""
     bl_idname = "object.create_issue_camera"
@@ -768,7 +3215,299 @@ class SetCameraAndCreateFace(bpy.types.Operator):
     bl_label = "Create Projection Face"
 
     def execute(self, context):
-        main_set_camera_and_create_face(context)
+        try:
+            main_set_camera_and_create_face(context)
+        except LookupError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class ProjectVisibleSurfaces(bpy.types.Operator):
+    """Project the snapshot onto every surface that is visible in it"""
+    bl_idname = "object.project_visible_surfaces"
+    bl_label = "Project on Visible Surfaces"
+
+    def execute(self, context):
+        try:
+            patches = main_project_visible_surfaces(context)
+        except LookupError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"{len(patches)} projection patches created.")
+        return {'FINISHED'}
+
+class UpdateIssueProjection(bpy.types.Operator):
+    """Update the active projection face with a changed viewpoint or snapshot of the issue"""
+    bl_idname = "object.update_issue_projection"
+    bl_label = "Update Projection Face"
+
+    def execute(self, context):
+        projection_face = find_issue_projection(context.active_object)
+        if projection_face is None:
+            self.report({'ERROR'}, "Select a projection face or annotation layer of an issue.")
+            return {'CANCELLED'}
+        
+        try:
+            main_update_issue_projection(context, projection_face)
+        except LookupError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+# the topic of the operators below is the topic of the active object if no GUID is given
+
+def get_operator_topic_guid(operator, context):
+    if operator.topic_guid:
+        return operator.topic_guid
+    return context.active_object.get(issue_topic_property) if context.active_object else None
+
+class ReopenIssue(bpy.types.Operator):
+    """Create the camera of a stored issue again and select its projection"""
+    bl_idname = "object.reopen_issue"
+    bl_label = "Reopen Issue"
+    
+    topic_guid: bpy.props.StringProperty()
+
+    def execute(self, context):
+        try:
+            main_reopen_issue(context, get_operator_topic_guid(self, context))
+        except (LookupError, FileNotFoundError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class DeleteIssueProjection(bpy.types.Operator):
+    """Remove the projection face, annotation layer and record of a stored issue"""
+    bl_idname = "object.delete_issue_projection"
+    bl_label = "Delete Issue Projection"
+    
+    topic_guid: bpy.props.StringProperty()
+
+    def execute(self, context):
+        if not delete_issue_record(context.scene, get_operator_topic_guid(self, context)):
+            self.report({'ERROR'}, "Select a projection face or annotation layer of a stored issue.")
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class LoadBCFTopics(bpy.types.Operator):
+    """Read the topics of the BCF archive into the issue browser"""
+    bl_idname = "object.load_bcf_topics"
+    bl_label = "Load Topics"
+
+    def execute(self, context):
+        archive_path = bpy.path.abspath(context.scene.import_filepath)
+        if not (os.path.isdir(archive_path) or zipfile.is_zipfile(archive_path)):
+            self.report({'ERROR'}, "Select a BCF archive or an extracted BCF folder.")
+            return {'CANCELLED'}
+        
+        start_loading_topics(context.scene, archive_path)
+        return {'FINISHED'}
+
+class ProjectSelectedTopics(bpy.types.Operator):
+    """Create the projection faces of the selected topics of the issue browser"""
+    bl_idname = "object.project_selected_topics"
+    bl_label = "Project Selected Topics"
+
+    def execute(self, context):
+        scene = context.scene
+        topic_guids = {item.guid for item in scene.bcf_topics if item.selected}
+        if not topic_guids and 0 <= scene.bcf_topic_index < len(scene.bcf_topics):
+            topic_guids = {scene.bcf_topics[scene.bcf_topic_index].guid}
+        if not topic_guids:
+            self.report({'ERROR'}, "Select topics in the issue browser.")
+            return {'CANCELLED'}
+        
+        results = main_batch_process_issues(context, scene.bcf_topics_archive, topic_guids, update=True)
+        failed = sum(1 for result in results if not result["success"])
+        self.report({'WARNING'} if failed else {'INFO'}, f"{len(results) - failed} of {len(results)} issues processed, {failed} failed.")
+        return {'FINISHED'}
+
+class ProcessIssuesModal(bpy.types.Operator):
+    """Process the topics of the BCF archive while the interface stays usable, Esc cancels"""
+    bl_idname = "object.process_issues_modal"
+    bl_label = "Process Issues in Background"
+
+    def execute(self, context):
+        scene = context.scene
+        archive_path = bpy.path.abspath(scene.import_filepath)
+        if not (os.path.isdir(archive_path) or zipfile.is_zipfile(archive_path)):
+            self.report({'ERROR'}, "Select a BCF archive or an extracted BCF folder.")
+            return {'CANCELLED'}
+        
+        # the selected topics of the issue browser, or every topic
+        topic_guids = None
+        if os.path.normcase(bpy.path.abspath(scene.bcf_topics_archive)) == os.path.normcase(archive_path):
+            topic_guids = {item.guid for item in scene.bcf_topics if item.selected} or None
+        
+        self._archive_path = archive_path
+        self._executor = ThreadPoolExecutor(resample_threads)
+        self._topics_future = self._executor.submit(lambda: [topic for topic in iter_bcf_topics(archive_path) if topic_guids is None or topic.guid in topic_guids])
+        self._jobs = None
+        self._prefetch = {}
+        self._job = None
+        self._steps = None
+        self._future = None
+        self._results = []
+        self._profile = None
+        self._tracing = tracemalloc.is_tracing()
+        
+        window_manager = context.window_manager
+        self._timer = window_manager.event_timer_add(0.05, window=context.window)
+        window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.finish(context, cancelled=True)
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        
+        # main thread work in small slices, the interface is handled in between
+        deadline = time.perf_counter() + job_slice_seconds
+        while time.perf_counter() < deadline and self.advance(context):
+            pass
+        
+        if self._jobs is not None and not self._jobs and self._steps is None:
+            self.finish(context)
+            return {'FINISHED'}
+        
+        if self._jobs is not None:
+            total = len(self._results) + len(self._jobs) + (self._steps is not None)
+            context.workspace.status_text_set(f"BCF Issue View: {len(self._results)} of {total} issues processed, Esc to cancel")
+        return {'PASS_THROUGH'}
+    
+    # read the files of the next topics in the thread pool
+    def prefetch(self):
+        for topic, snapshot_path, viewpoint_path in self._jobs[:job_prefetch_count]:
+            if topic.guid not in self._prefetch:
+                self._prefetch[topic.guid] = self._executor.submit(read_issue_files, snapshot_path, viewpoint_path)
+    
+    # do one step, returns False if there is nothing to do until a background job is finished
+    def advance(self, context):
+        
+        if self._jobs is None:
+            if not self._topics_future.done():
+                return False
+            self._jobs = []
+            for topic in self._topics_future.result():
+                try:
+                    self._jobs.append((topic, *get_bcf_viewpoint_paths(self._archive_path, topic)))
+                except LookupError as e:
+                    self._results.append({"guid": topic.guid, "title": topic.title, "success": False, "error": str(e), "objects": []})
+            self.prefetch()
+            return True
+        
+        if self._steps is None:
+            if not self._jobs:
+                return False
+            topic, snapshot_path, viewpoint_path = self._jobs[0]
+            prefetched = self._prefetch[topic.guid]
+            if not prefetched.done():
+                return False
+            
+            self._jobs.pop(0)
+            del self._prefetch[topic.guid]
+            self.prefetch()
+            self._job = (topic, time.perf_counter())
+            if prefetched.exception() is not None:
+                self.finish_job(context, prefetched.exception())
+                return True
+            # the context of a modal call is only valid during the call, bpy.context resolves the scene and view layer again in every slice
+            self._steps = issue_pipeline_steps(bpy.context, snapshot_path, viewpoint_path, prefetched.result(), topic.guid)
+            self._send = self._steps.send
+            self._value = None
+        
+        if self._future is not None:
+            if not self._future.done():
+                return False
+            error = self._future.exception()
+            self._send, self._value = (self._steps.throw, error) if error is not None else (self._steps.send, self._future.result())
+            self._future = None
+        
+        self.resume_profile()
+        try:
+            work = self._send(self._value)
+        except StopIteration as stop:
+            self.finish_job(context, None, stop.value)
+            return True
+        except Exception as e:
+            traceback.print_exc()
+            self.finish_job(context, e)
+            return True
+        finally:
+            self.suspend_profile()
+        
+        self._send, self._value = self._steps.send, None
+        if work is not None:
+            self._future = self._executor.submit(work)
+            return False
+        return True
+    
+    # the profile of the issue is only active during the slices of the job,
+    # so an issue processed by the user in between gets its own profile and the memory is only traced in the slices
+    def resume_profile(self):
+        global current_issue_profile
+        current_issue_profile = self._profile
+        if self._profile is not None and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    def suspend_profile(self):
+        global current_issue_profile
+        self._profile = current_issue_profile
+        current_issue_profile = None
+        if self._profile is not None and not self._tracing:
+            self._profile["peak_memory"] = max(self._profile["peak_memory"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    
+    def finish_job(self, context, error, objects=None):
+        topic, start = self._job
+        result = {"guid": topic.guid, "title": topic.title, "success": error is None, "error": None if error is None else str(error), "objects": [], "seconds": time.perf_counter() - start}
+        
+        if error is None:
+            projection_face, annotation_obj = objects
+            set_issue_record(context.scene, projection_face, annotation_obj, topic)
+            result["objects"] = [projection_face.name, annotation_obj.name]
+        else:
+            ensure_object_mode()
+        
+        self._results.append(result)
+        self._steps = None
+        self._job = None
+    
+    def finish(self, context, cancelled=False):
+        if self._steps is not None:
+            self.resume_profile()
+            try:
+                self._steps.close()
+            finally:
+                self.suspend_profile()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        restore_bcf_components(context.view_layer)
+        context.window_manager.event_timer_remove(self._timer)
+        context.workspace.status_text_set(None)
+        
+        failed = sum(1 for result in self._results if not result["success"])
+        message = f"{len(self._results) - failed} of {len(self._results)} issues processed, {failed} failed."
+        if cancelled:
+            message = "Cancelled, " + message
+        print(message)
+        self.report({'WARNING'} if failed or cancelled else {'INFO'}, message)
+
+class BatchProcessIssues(bpy.types.Operator):
+    """Create the projection faces of every topic in a BCF archive or folder"""
+    bl_idname = "object.batch_process_issues"
+    bl_label = "Process All Issues"
+
+    def execute(self, context):
+        archive_path = bpy.path.abspath(context.scene.import_filepath)
+        if not (os.path.isdir(archive_path) or zipfile.is_zipfile(archive_path)):
+            self.report({'ERROR'}, "Select a BCF archive or an extracted BCF folder.")
+            return {'CANCELLED'}
+        
+        results = main_batch_process_issues(context, archive_path)
+        failed = sum(1 for result in results if not result["success"])
+        self.report({'WARNING'} if failed else {'INFO'}, f"{len(results) - failed} of {len(results)} issues processed, {failed} failed.")
         return {'FINISHED'}
 
 # create a layout for buttons in properties scene
@@ -792,6 +3531,10 @@ class LayoutPanel(bpy.types.Panel):
         layout.prop(scene, "import_filepath", text="Import BCF Issue Pircture")
         row = layout.row()
         
+        # topic of a .bcfzip archive, the first topic is used if empty
+        layout.prop(scene, "bcf_topic_guid", text="BCF Topic GUID")
+        row = layout.row()
+        
         # set focal length
         layout.prop(scene.focal_length, "value")
         row = layout.row()
@@ -811,31 +3554,256 @@ class LayoutPanel(bpy.types.Panel):
         row = layout.row()
         row.scale_y = 1
         row.operator("object.set_camera_and_create_face")
+        row = layout.row()
+        row.scale_y = 1
+        row.operator("object.update_issue_projection")
+        row = layout.row()
+        row.scale_y = 1
+        row.operator("object.project_visible_surfaces")
+        
+        # issues stored in the scene
+        layout.label(text=f"Stored Issues: {len(scene.bcf_issues)}")
+        row = layout.row()
+        row.scale_y = 1
+        row.operator("object.reopen_issue")
+        row.operator("object.delete_issue_projection")
+        layout.prop(scene, "bcf_issue_database", text="Issue Index (SQLite)")
+        
+        # process all issues of the archive
+        layout.label(text="Process BCF Archive:")
+        row = layout.row()
+        row.scale_y = 1
+        row.operator("object.batch_process_issues")
+        row.operator("object.process_issues_modal")
+        
+        # folder for created images
+        layout.prop(scene, "bcf_image_folder", text="Image Folder")
+        
+        # disk space for projection images
+        layout.prop(scene, "bcf_cache_size_limit", text="Image Cache Size (MB)")
+        
+        # visibility, selection and coloring of the IFC components
+        layout.prop(scene, "bcf_apply_components", text="Apply Viewpoint Components")
+        
+        # size of created images
+        layout.prop(scene.texture_resolution, "max_size")
+        layout.prop(scene.texture_resolution, "power_of_two")
+        if scene.texture_resolution.last_width:
+            layout.label(text=f"Last Texture Size: {scene.texture_resolution.last_width} x {scene.texture_resolution.last_height}")
+
+# list of the topics with filters, only the visible rows are drawn
+
+class BCF_UL_topics(bpy.types.UIList):
+    
+    filter_status: bpy.props.StringProperty(name="Status")
+    filter_assignee: bpy.props.StringProperty(name="Assigned To")
+    filter_label: bpy.props.StringProperty(name="Label")
+    filter_date_from: bpy.props.StringProperty(name="From", description="Earliest creation date as YYYY-MM-DD")
+    filter_date_to: bpy.props.StringProperty(name="To", description="Latest creation date as YYYY-MM-DD")
+    
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "selected", text="")
+        row.label(text=item.title, icon_value=get_topic_thumbnail(item))
+        row.label(text=item.status)
+        row.label(text=item.assigned_to)
+        if get_issue_record(context.scene, item.guid) is not None:
+            row.label(text="", icon='CHECKMARK')
+    
+    def draw_filter(self, context, layout):
+        layout.prop(self, "filter_name", text="Title")
+        row = layout.row(align=True)
+        row.prop(self, "filter_status")
+        row.prop(self, "filter_assignee")
+        row.prop(self, "filter_label")
+        row = layout.row(align=True)
+        row.prop(self, "filter_date_from")
+        row.prop(self, "filter_date_to")
+    
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        flags = [self.bitflag_filter_item] * len(items)
+        
+        filters = [
+            ("title", self.filter_name.lower()),
+            ("status", self.filter_status.lower()),
+            ("assigned_to", self.filter_assignee.lower()),
+            ("labels", self.filter_label.lower())
+        ]
+        filters = [(name, value) for name, value in filters if value]
+        date_from = self.filter_date_from
+        date_to = self.filter_date_to
+        
+        if filters or date_from or date_to:
+            for index, item in enumerate(items):
+                date = item.creation_date[:10]
+                if any(value not in getattr(item, name).lower() for name, value in filters) or (date_from and date < date_from) or (date_to and date > date_to):
+                    flags[index] = 0
+        
+        return flags, []
+
+class IssueBrowserPanel(bpy.types.Panel):
+    """Lists the topics of a BCF archive"""
+    bl_label = "Issue Browser"
+    bl_idname = "SCENE_PT_bcf_issue_view_browser"
+    bl_parent_id = "SCENE_PT_layout"
+    bl_space_type = 'PROPERTIES'
+    bl_region_type = 'WINDOW'
+    bl_context = "scene"
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        
+        row = layout.row()
+        row.operator("object.load_bcf_topics")
+        row.label(text=f"{len(scene.bcf_topics)} Topics" + (", loading ..." if topic_loader is not None else ""))
+        
+        layout.template_list("BCF_UL_topics", "", scene, "bcf_topics", scene, "bcf_topic_index", rows=8)
+        
+        # large thumbnail of the active topic
+        if 0 <= scene.bcf_topic_index < len(scene.bcf_topics):
+            item = scene.bcf_topics[scene.bcf_topic_index]
+            icon_id = get_topic_thumbnail(item)
+            if icon_id:
+                layout.template_icon(icon_value=icon_id, scale=8)
+            layout.label(text=f"{item.creation_date[:10]}  {item.labels}")
+        
+        layout.operator("object.project_selected_topics")
+
+# readout of the stages of the last run
+
+class PerformancePanel(bpy.types.Panel):
+    """Shows where the time of the last issue went"""
+    bl_label = "Last Run"
+    bl_idname = "SCENE_PT_bcf_issue_view_performance"
+    bl_parent_id = "SCENE_PT_layout"
+    bl_space_type = 'PROPERTIES'
+    bl_region_type = 'WINDOW'
+    bl_context = "scene"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        
+        if not context.scene.bcf_last_profile:
+            layout.label(text="No issue processed yet.")
+            return
+        
+        profile = json.loads(context.scene.bcf_last_profile)
+        layout.label(text=f"Total: {profile['seconds']:.2f} s, peak {profile['peak_memory'] / 1024 / 1024:.1f} MB")
+        
+        column = layout.column(align=True)
+        for stage in profile["stages"]:
+            row = column.row()
+            row.label(text=stage["name"])
+            row.label(text=f"{stage['seconds'] * 1000:.0f} ms")
+            row.label(text=f"{stage['peak_memory'] / 1024 / 1024:.1f} MB")
 
 # register classes
 def register():
+    global topic_previews
     bpy.utils.register_class(SetCameraAndCreateFace)  
     bpy.types.VIEW3D_MT_object.append(menu_func)
     bpy.utils.register_class(LayoutPanel)
+    bpy.utils.register_class(PerformancePanel)
     bpy.utils.register_class(CreateIssueCamera)
+    bpy.utils.register_class(UpdateIssueProjection)
+    bpy.utils.register_class(ProjectVisibleSurfaces)
+    bpy.utils.register_class(BatchProcessIssues)
+    bpy.utils.register_class(ProcessIssuesModal)
+    bpy.utils.register_class(ReopenIssue)
+    bpy.utils.register_class(DeleteIssueProjection)
+    bpy.utils.register_class(BCFIssueRecord)
+    bpy.utils.register_class(BCFTopicItem)
+    bpy.utils.register_class(LoadBCFTopics)
+    bpy.utils.register_class(ProjectSelectedTopics)
+    bpy.utils.register_class(BCF_UL_topics)
+    bpy.utils.register_class(IssueBrowserPanel)
     bpy.utils.register_class(SetFocalLength)
     bpy.utils.register_class(SetSensorWidth)
+    bpy.utils.register_class(TextureResolution)
     # temporary data
     bpy.types.Scene.import_filepath = bpy.props.StringProperty(subtype="FILE_PATH")
+    bpy.types.Scene.bcf_topic_guid = bpy.props.StringProperty(description="GUID of the topic in a .bcfzip archive. The first topic is used if empty")
+    bpy.types.Scene.bcf_image_folder = bpy.props.StringProperty(subtype="DIR_PATH", description="Folder for the created images. A folder on the desktop is used if empty")
+    bpy.types.Scene.bcf_last_profile = bpy.props.StringProperty(description="Stages of the last processed issue as JSON")
+    bpy.types.Scene.bcf_cache_size_limit = bpy.props.IntProperty(description="Disk space in MB for projection images in the image folder. The least recently used images that are not loaded are removed", default=2048, min=0)
     bpy.types.Scene.focal_length = bpy.props.PointerProperty(type=SetFocalLength)
     bpy.types.Scene.sensor_width = bpy.props.PointerProperty(type=SetSensorWidth)
+    bpy.types.Scene.texture_resolution = bpy.props.PointerProperty(type=TextureResolution)
+    bpy.types.Scene.bcf_issues = bpy.props.CollectionProperty(type=BCFIssueRecord)
+    bpy.types.Scene.bcf_apply_components = bpy.props.BoolProperty(description="Apply the visibility, selection and coloring of the IFC components of the viewpoint", default=True)
+    bpy.types.Scene.bcf_issue_database = bpy.props.StringProperty(subtype="FILE_PATH", description="Optional SQLite file that mirrors the stored issues for other tools")
+    bpy.types.Scene.bcf_topics = bpy.props.CollectionProperty(type=BCFTopicItem)
+    bpy.types.Scene.bcf_topic_index = bpy.props.IntProperty()
+    bpy.types.Scene.bcf_topics_archive = bpy.props.StringProperty(subtype="FILE_PATH")
+    # thumbnails of the issue browser
+    topic_previews = bpy.utils.previews.new()
+    # keep the scene BVH up to date
+    bpy.app.handlers.depsgraph_update_post.append(invalidate_scene_bvh)
+    bpy.app.handlers.load_post.append(clear_scene_bvh)
+    bpy.app.handlers.undo_post.append(clear_scene_bvh)
+    bpy.app.handlers.load_post.append(clear_issue_record_index)
+    bpy.app.handlers.undo_post.append(clear_issue_record_index)
+    bpy.app.handlers.depsgraph_update_post.append(update_ifc_guid_index)
+    bpy.app.handlers.load_post.append(clear_ifc_guid_index)
+    bpy.app.handlers.undo_post.append(clear_ifc_guid_index)
+    bpy.app.handlers.load_post.append(clear_component_state)
 
 def unregister():
+    global topic_previews
     bpy.utils.unregister_class(SetCameraAndCreateFace)
     bpy.types.VIEW3D_MT_object.remove(menu_func)
+    bpy.utils.unregister_class(PerformancePanel)
+    bpy.utils.unregister_class(IssueBrowserPanel)
     bpy.utils.unregister_class(LayoutPanel)
     bpy.utils.unregister_class(CreateIssueCamera)
+    bpy.utils.unregister_class(UpdateIssueProjection)
+    bpy.utils.unregister_class(ProjectVisibleSurfaces)
+    bpy.utils.unregister_class(BatchProcessIssues)
+    bpy.utils.unregister_class(ProcessIssuesModal)
+    bpy.utils.unregister_class(ReopenIssue)
+    bpy.utils.unregister_class(DeleteIssueProjection)
+    bpy.utils.unregister_class(BCFIssueRecord)
+    bpy.utils.unregister_class(BCF_UL_topics)
+    bpy.utils.unregister_class(ProjectSelectedTopics)
+    bpy.utils.unregister_class(LoadBCFTopics)
+    bpy.utils.unregister_class(BCFTopicItem)
     bpy.utils.unregister_class(SetFocalLength)
     bpy.utils.unregister_class(SetSensorWidth)
+    bpy.utils.unregister_class(TextureResolution)
     # temporary data
     del bpy.types.Scene.import_filepath
+    del bpy.types.Scene.bcf_topic_guid
+    del bpy.types.Scene.bcf_image_folder
+    del bpy.types.Scene.bcf_cache_size_limit
+    del bpy.types.Scene.bcf_last_profile
     del bpy.types.Scene.focal_length
     del bpy.types.Scene.sensor_width
+    del bpy.types.Scene.texture_resolution
+    del bpy.types.Scene.bcf_issues
+    del bpy.types.Scene.bcf_apply_components
+    del bpy.types.Scene.bcf_issue_database
+    del bpy.types.Scene.bcf_topics
+    del bpy.types.Scene.bcf_topic_index
+    del bpy.types.Scene.bcf_topics_archive
+    bpy.utils.previews.remove(topic_previews)
+    topic_previews = None
+    clear_topic_thumbnails()
+    bpy.app.handlers.depsgraph_update_post.remove(invalidate_scene_bvh)
+    bpy.app.handlers.load_post.remove(clear_scene_bvh)
+    bpy.app.handlers.undo_post.remove(clear_scene_bvh)
+    bpy.app.handlers.load_post.remove(clear_issue_record_index)
+    bpy.app.handlers.undo_post.remove(clear_issue_record_index)
+    bpy.app.handlers.depsgraph_update_post.remove(update_ifc_guid_index)
+    bpy.app.handlers.load_post.remove(clear_ifc_guid_index)
+    bpy.app.handlers.undo_post.remove(clear_ifc_guid_index)
+    bpy.app.handlers.load_post.remove(clear_component_state)
 
 if __name__ == "__main__":
-    register()
\ No newline at end of file
+    register()
+    
+    # arguments after "--" are meant for the add-on
+    if "--" in sys.argv:
+        main_command_line(sys.argv[sys.argv.index("--") + 1:])
\ No newline at end of file
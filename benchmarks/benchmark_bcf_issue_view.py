@@ -0,0 +1,227 @@
+# benchmark of the BCF Issue View stages on synthetic IFC-like scenes
+# blender --background --factory-startup --python benchmarks/benchmark_bcf_issue_view.py -- --objects 1000 10000 --polygons 24 --issues 5 --output results
+
+import bpy
+import os
+import sys
+import csv
+import json
+import math
+import time
+import random
+import struct
+import zlib
+import zipfile
+import tempfile
+import argparse
+import statistics
+from mathutils import Vector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import BCF_Issue_View as issue_view
+
+# synthetic snapshot written without any image library
+
+def write_png(path, width, height):
+    
+    rows = []
+    for y in range(height):
+        row = bytearray([0])
+        for x in range(width):
+            row += bytes((x * 255 // width, y * 255 // height, 128, 255))
+        rows.append(bytes(row))
+    
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+    
+    with open(path, 'wb') as png:
+        png.write(b"\x89PNG\r\n\x1a\n")
+        png.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+        png.write(chunk(b"IDAT", zlib.compress(b"".join(rows))))
+        png.write(chunk(b"IEND", b""))
+
+# wall-like box mesh with about the given number of polygons
+
+def create_wall_mesh(polygons):
+    
+    cuts = max(1, round(math.sqrt(polygons / 6)))
+    size = Vector((4.0, 0.2, 3.0))
+    vertices = []
+    faces = []
+    
+    # every side of the box is a grid of cuts x cuts quads
+    for axis in range(3):
+        for side in (-0.5, 0.5):
+            u_axis, v_axis = [other for other in range(3) if other != axis]
+            start = len(vertices)
+            for i in range(cuts + 1):
+                for j in range(cuts + 1):
+                    co = [0.0, 0.0, 0.0]
+                    co[axis] = side * size[axis]
+                    co[u_axis] = (i / cuts - 0.5) * size[u_axis]
+                    co[v_axis] = (j / cuts - 0.5) * size[v_axis]
+                    vertices.append(co)
+            for i in range(cuts):
+                for j in range(cuts):
+                    a = start + i * (cuts + 1) + j
+                    quad = (a, a + cuts + 1, a + cuts + 2, a + 1)
+                    faces.append(quad if side > 0 else quad[::-1])
+    
+    mesh = bpy.data.meshes.new("Wall")
+    mesh.from_pydata(vertices, [], faces)
+    mesh.update()
+    return mesh
+
+# scene of walls on a grid, every object has its own mesh like imported IFC products
+
+def create_scene(object_count, polygons, seed):
+    
+    # start from an empty scene, the add-on stays registered
+    scene = bpy.context.scene
+    issue_view.remove_objects(list(scene.objects))
+    issue_view.clear_scene_bvh()
+    
+    rng = random.Random(seed)
+    template = create_wall_mesh(polygons)
+    columns = math.ceil(math.sqrt(object_count))
+    spacing = 6.0
+    
+    for index in range(object_count):
+        obj = bpy.data.objects.new(f"IfcWall/{index}", template.copy())
+        obj.location = ((index % columns) * spacing, (index // columns) * spacing, 1.5)
+        obj.rotation_euler.z = rng.choice((0.0, math.pi / 2))
+        scene.collection.objects.link(obj)
+    
+    bpy.data.meshes.remove(template)
+    bpy.context.view_layer.update()
+    return columns * spacing
+
+# BCF archive with cameras looking at random walls of the scene
+
+def create_bcf_archive(path, issue_count, extent, seed, snapshot_size):
+    
+    rng = random.Random(seed)
+    snapshot_path = os.path.join(os.path.dirname(path), "snapshot.png")
+    write_png(snapshot_path, *snapshot_size)
+    
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr("bcf.version", '<?xml version="1.0"?><Version VersionId="2.1"/>')
+        for index in range(issue_count):
+            guid = f"00000000-0000-0000-0000-{index:012d}"
+            target = Vector((rng.uniform(0, extent), rng.uniform(0, extent), 1.5))
+            location = target + Vector((rng.uniform(-4, 4), rng.uniform(-4, 4), rng.uniform(0, 2)))
+            direction = (target - location).normalized()
+            
+            archive.writestr(f"{guid}/markup.bcf", (
+                f'<?xml version="1.0"?><Markup><Topic Guid="{guid}" TopicType="Issue" TopicStatus="Open">'
+                f'<Title>Benchmark issue {index}</Title></Topic>'
+                f'<Viewpoints Guid="{guid}"><Viewpoint>viewpoint.bcfv</Viewpoint><Snapshot>snapshot.png</Snapshot></Viewpoints></Markup>'
+            ))
+            archive.writestr(f"{guid}/viewpoint.bcfv", (
+                '<?xml version="1.0"?><VisualizationInfo><PerspectiveCamera>'
+                f'<CameraViewPoint><X>{location.x}</X><Y>{location.y}</Y><Z>{location.z}</Z></CameraViewPoint>'
+                f'<CameraDirection><X>{direction.x}</X><Y>{direction.y}</Y><Z>{direction.z}</Z></CameraDirection>'
+                '<CameraUpVector><X>0</X><Y>0</Y><Z>1</Z></CameraUpVector>'
+                '<FieldOfView>60</FieldOfView></PerspectiveCamera></VisualizationInfo>'
+            ))
+            archive.write(snapshot_path, f"{guid}/snapshot.png")
+
+def timed(timings, name, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    timings.append((name, time.perf_counter() - start))
+    return result
+
+# time the stages of every issue of the archive
+# the timings of issues without a target are kept and marked, so every issue is counted in every run
+
+def run_issues(archive_path):
+    
+    context = bpy.context
+    rows = []
+    
+    for topic in issue_view.iter_bcf_topics(archive_path):
+        snapshot_path, viewpoint_path = issue_view.get_bcf_viewpoint_paths(archive_path, topic)
+        timings = []
+        camera = timed(timings, "main_create_camera_with_BCF_data", issue_view.main_create_camera_with_BCF_data, context, snapshot_path, viewpoint_path)[0]
+        created = [camera]
+        
+        try:
+            histogram = timed(timings, "get_visible_face_histogram", issue_view.get_visible_face_histogram, camera)
+            first_object, largest_face = timed(timings, "get_largest_visible_cluster", issue_view.get_largest_visible_cluster, camera, histogram)
+            if largest_face is not None:
+                similar_faces = timed(timings, "get_face_with_similar_normal", issue_view.get_face_with_similar_normal, first_object, largest_face)
+                planar_frame = issue_view.get_layer_uv_frame(first_object, similar_faces, issue_view.distance_between_layers)
+                annotation_obj = timed(timings, "create_annotation_layer", issue_view.create_annotation_layer, similar_faces, first_object, issue_view.distance_between_layers)
+                created.append(annotation_obj)
+                issue_view.set_planar_uv_frame_property(annotation_obj, planar_frame)
+                image_size = issue_view.get_planned_texture_resolution(annotation_obj, camera)
+                timed(timings, "bake_projection_image", issue_view.bake_projection_image, issue_view.get_snapshot_image(snapshot_path), camera, planar_frame, image_size)
+        finally:
+            issue_view.remove_objects(created)
+        
+        for name, seconds in timings:
+            rows.append({"issue": topic.guid, "function": name, "seconds": seconds, "target_found": largest_face is not None})
+    
+    return rows
+
+def main(argv):
+    
+    parser = argparse.ArgumentParser(prog="benchmark_bcf_issue_view.py")
+    parser.add_argument("--objects", type=int, nargs="+", default=[1000, 10000], help="object counts of the scenes")
+    parser.add_argument("--polygons", type=int, default=24, help="polygons per object")
+    parser.add_argument("--issues", type=int, default=5, help="issues per scene")
+    parser.add_argument("--snapshot-size", type=int, nargs=2, default=[960, 540], help="snapshot width and height")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the scene and camera generation")
+    parser.add_argument("--output", default="benchmark_results", help="folder for the JSON and CSV results")
+    args = parser.parse_args(argv)
+    
+    os.makedirs(args.output, exist_ok=True)
+    issue_view.register()
+    results = []
+    misses = {}
+    
+    for object_count in args.objects:
+        work_folder = tempfile.mkdtemp(prefix="bcf_issue_view_benchmark_")
+        
+        start = time.perf_counter()
+        extent = create_scene(object_count, args.polygons, args.seed)
+        setup_seconds = time.perf_counter() - start
+        
+        # a fresh image folder per scene so the projection images are not taken from the cache
+        bpy.context.scene.bcf_image_folder = work_folder
+        archive_path = os.path.join(work_folder, "benchmark.bcfzip")
+        create_bcf_archive(archive_path, args.issues, extent, args.seed, args.snapshot_size)
+        
+        for row in run_issues(archive_path):
+            row.update(objects=object_count, polygons_per_object=args.polygons)
+            results.append(row)
+        
+        # issues whose rays hit no object are counted, the later stages of them are not timed
+        misses[object_count] = len({row["issue"] for row in results if row["objects"] == object_count and not row["target_found"]})
+        
+        print(f"{object_count} objects: scene created in {setup_seconds:.1f} s, {misses[object_count]} of {args.issues} issues without target")
+        for function in sorted({row["function"] for row in results if row["objects"] == object_count}):
+            seconds = [row["seconds"] for row in results if row["objects"] == object_count and row["function"] == function]
+            print(f"  {function}: median {statistics.median(seconds) * 1000:.1f} ms over {len(seconds)} issues")
+    
+    summary = {
+        "blender": bpy.app.version_string,
+        "addon_version": list(issue_view.bl_info["version"]),
+        "polygons_per_object": args.polygons,
+        "issues": args.issues,
+        "seed": args.seed,
+        "misses": misses,
+        "results": results
+    }
+    
+    with open(os.path.join(args.output, "results.json"), 'w') as result_file:
+        json.dump(summary, result_file, indent=2)
+    
+    with open(os.path.join(args.output, "results.csv"), 'w', newline='') as result_file:
+        writer = csv.DictWriter(result_file, fieldnames=["objects", "polygons_per_object", "issue", "function", "seconds", "target_found"])
+        writer.writeheader()
+        writer.writerows(results)
+
+if __name__ == "__main__":
+    main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])